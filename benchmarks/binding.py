@@ -0,0 +1,32 @@
+"""Measure how ``SimpleView`` binds shared parameters.
+"""
+
+from django_oopviews import create_view
+from django_oopviews.simple import SimpleView
+
+
+class ManyArgsView(SimpleView):
+    args = ['a%d' % i for i in range(8)]
+    kwargs = dict([('k%d' % i, i) for i in range(8)])
+
+    def __call__(self):
+        return self.a0
+
+
+POSITIONAL = tuple(range(8))
+KEYWORDS = dict([('k%d' % i, -i) for i in range(4)])
+ARGS_AS_KEYWORDS = dict([('a%d' % i, i) for i in range(4, 8)])
+
+
+def bind(view, args, kwargs):
+    return lambda: view('request', *args, **kwargs)
+
+
+view = create_view(ManyArgsView)
+
+BENCHMARKS = [
+    ('SimpleView, 8 args, default kwargs', bind(view, POSITIONAL, {})),
+    ('SimpleView, 8 args, 4 kwargs', bind(view, POSITIONAL, KEYWORDS)),
+    ('SimpleView, 4 args + 4 as keywords',
+        bind(view, POSITIONAL[:4], ARGS_AS_KEYWORDS)),
+]
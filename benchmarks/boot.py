@@ -0,0 +1,48 @@
+"""Measure how long it takes to create the proxy for a large view, as
+happens when a URLconf is imported.
+
+As proxies are cached per view class, each operation creates the proxy for
+a new subclass of ``LargeView``; its nested views are shared with all the
+others. See ``memory.py`` for the memory used by each proxy.
+"""
+
+from django_oopviews import View, create_view
+
+
+def make_view(name, methods, nested=0):
+    attrs = {}
+    for i in range(methods):
+        attrs['method%d' % i] = lambda self, request: None
+    for i in range(nested):
+        attrs['sub%d' % i] = make_view('%s_sub%d' % (name, i), methods)
+    return type(name, (View,), attrs)
+
+
+LargeView = make_view('LargeView', 30, nested=10)
+
+
+def new_view():
+    return type('LargeView', (LargeView,), {})
+
+
+def create_and_use_all():
+    proxy = create_view(new_view())
+    for i in range(10):
+        subview = getattr(proxy, 'sub%d' % i)
+        for j in range(30):
+            getattr(subview, 'method%d' % j)
+    for j in range(30):
+        getattr(proxy, 'method%d' % j)
+
+
+def create_and_use_one():
+    create_view(new_view()).sub0.method0('request')
+
+
+BENCHMARKS = [
+    ('create_view, 30 methods + 10 nested views',
+        lambda: create_view(new_view())),
+    ('create_view, cached', lambda: create_view(LargeView)),
+    ('create_view, then call one nested method', create_and_use_one),
+    ('create_view, then access everything', create_and_use_all),
+]
@@ -0,0 +1,50 @@
+"""Measure the per-call overhead of dispatching through a proxy.
+"""
+
+from django_oopviews import View, create_view
+
+
+def plain(request, id):
+    return id
+
+
+class NoHooks(View):
+    def __call__(self, request, id):
+        return id
+
+class Before(NoHooks):
+    def __before__(self, args, kwargs):
+        self.request = args[0]
+
+class After(NoHooks):
+    def __after__(self, response):
+        return response
+
+class Both(Before, After):
+    pass
+
+class Scoped(Both):
+    request_scoped = True
+
+class Nested(View):
+    class sub(View):
+        class leaf(Both):
+            pass
+
+
+def call(view):
+    return lambda: view('request', 1)
+
+
+nested = create_view(Nested)
+
+BENCHMARKS = [
+    ('plain function', call(plain)),
+    ('proxy, no hooks', call(create_view(NoHooks))),
+    ('proxy, __before__', call(create_view(Before))),
+    ('proxy, __after__', call(create_view(After))),
+    ('proxy, both hooks', call(create_view(Both))),
+    ('proxy, both hooks, request scoped', call(create_view(Scoped))),
+    ('nested subview, both hooks',
+        lambda: nested.sub.leaf('request', 1)),
+]
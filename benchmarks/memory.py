@@ -0,0 +1,82 @@
+"""Measure the memory used by proxies, once all of their methods and nested
+views have been accessed.
+
+Run from the repository root::
+
+    python benchmarks/memory.py
+
+Requires ``tracemalloc`` (Python 3.4+).
+"""
+
+import gc
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import tracemalloc
+
+from django_oopviews import View, create_view
+
+
+def make_view(name, methods, nested=(), hooks=False):
+    attrs = {}
+    if hooks:
+        attrs['__before__'] = lambda self, args, kwargs: None
+        attrs['__after__'] = lambda self, response: response
+    for i in range(methods):
+        attrs['method%d' % i] = lambda self, request: None
+    for i, subview in enumerate(nested):
+        attrs['sub%d' % i] = subview
+    return type(name, (View,), attrs)
+
+
+def use_all(proxy):
+    for name in dir(proxy):
+        if not name.startswith('_'):
+            attr = getattr(proxy, name)
+            if name.startswith('sub'):
+                use_all(attr)
+
+
+def measure(make, number=200):
+    """Return the bytes allocated per proxy and kept alive, for ``number``
+    proxies of the view classes returned by ``make``.
+    """
+    classes = [make(i) for i in range(number)]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        proxies = []
+        for view_class in classes:
+            proxy = create_view(view_class)
+            use_all(proxy)
+            proxies.append(proxy)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (current - start) / float(number)
+
+
+def main():
+    Shared = make_view('Shared', 10, hooks=True)
+    cases = [
+        ('10 methods', lambda i: make_view('V%d' % i, 10)),
+        ('10 methods, with hooks',
+            lambda i: make_view('V%d' % i, 10, hooks=True)),
+        ('10 methods + 3 nested views',
+            lambda i: make_view('V%d' % i, 10, hooks=True, nested=[
+                make_view('S%d' % j, 10, hooks=True) for j in range(3)])),
+        ('10 methods + 3 shared nested views',
+            lambda i: make_view('V%d' % i, 10, hooks=True,
+                                nested=[Shared] * 3)),
+    ]
+    for label, make in cases:
+        print('%-48s %10.0f B/proxy' % (label, measure(make)))
+
+
+if __name__ == '__main__':
+    main()
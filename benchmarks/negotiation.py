@@ -0,0 +1,72 @@
+"""Measure content type negotiation with ``AbstractCTNView``, for the
+Accept headers sent by common browsers and API clients.
+"""
+
+from django.http import HttpRequest
+
+from django_oopviews import create_view
+from django_oopviews.ctn import AbstractCTNView
+
+
+ACCEPT_HEADERS = [
+    # Chrome, Firefox, Safari, old Internet Explorer
+    'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,'
+        'image/webp,image/apng,*/*;q=0.8,'
+        'application/signed-exchange;v=b3;q=0.7',
+    'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'image/jpeg, application/x-ms-application, image/gif, '
+        'application/xaml+xml, image/pjpeg, application/x-ms-xbap, */*',
+    # API clients and tools
+    'application/json',
+    'application/json, text/plain, */*',
+    'application/xml;q=0.9, application/json',
+    '*/*',
+    'text/*',
+]
+
+
+class NegotiatedView(AbstractCTNView):
+    ctn_accept_binding = {
+        'text/html': 'html',
+        'application/xhtml+xml': 'html',
+        'application/json': (1, 'json'),
+        'application/xml': (0.8, 'xml'),
+        'text/*': 'html',
+        '*/*': 'html',
+    }
+    def html(self, request):
+        return 'html'
+    def json(self, request):
+        return 'json'
+    def xml(self, request):
+        return 'xml'
+
+
+class UncachedView(NegotiatedView):
+    ctn_cache_size = 0
+
+
+def requests():
+    result = []
+    for accept in ACCEPT_HEADERS:
+        request = HttpRequest()
+        request.META['HTTP_ACCEPT'] = accept
+        result.append(request)
+    return result
+
+
+def negotiate(view):
+    corpus = requests()
+    def run():
+        for request in corpus:
+            view(request)
+    return run
+
+
+BENCHMARKS = [
+    ('ctn, %d Accept headers, cached' % len(ACCEPT_HEADERS),
+        negotiate(create_view(NegotiatedView))),
+    ('ctn, %d Accept headers, uncached' % len(ACCEPT_HEADERS),
+        negotiate(create_view(UncachedView))),
+]
@@ -0,0 +1,140 @@
+"""Run the benchmarks, and optionally compare them to a saved baseline.
+
+Run from the repository root::
+
+    python benchmarks/run.py                # run all benchmarks
+    python benchmarks/run.py dispatch       # only those of one module
+    python benchmarks/run.py --save         # save results as the baseline
+    python benchmarks/run.py --compare      # fail on regressions
+
+Each module listed in ``MODULES`` defines ``BENCHMARKS``, a list of
+``(label, function)`` tuples; the function is called without arguments
+and performs one operation. Results are reported as operations per
+second, using the best of several runs, and, where ``tracemalloc`` is
+available (Python 3.4+), the memory allocated per operation.
+
+The baseline is saved to ``benchmarks/baseline.json``; it only makes
+sense to compare results from the same machine and Python version, so
+none is committed, and ``--compare`` needs a ``--save`` first.
+"""
+
+import gc
+import json
+import optparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+MODULES = ['dispatch', 'negotiation', 'binding', 'boot']
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baseline.json')
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """Return the best number of calls of ``func`` per second."""
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time / 10:
+        number *= 10
+    best = min(timer.repeat(repeat, number))
+    return number / best
+
+
+def measure_allocations(func, number=1000):
+    """Return the number of bytes allocated per call of ``func``, counting
+    memory that is freed again, as peak bytes during ``number`` calls, and
+    what was kept, as bytes per call.
+    """
+    if tracemalloc is None:
+        return None
+    func()    # warm up caches
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        for i in range(number):
+            func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak': peak - start, 'kept': (current - start) / float(number)}
+
+
+def run(modules):
+    results = {}
+    for module_name in modules:
+        module = __import__('benchmarks.%s' % module_name,
+                            fromlist=['BENCHMARKS'])
+        for label, func in module.BENCHMARKS:
+            key = '%s: %s' % (module_name, label)
+            results[key] = {'ops': measure(func),
+                            'memory': measure_allocations(func)}
+            report(key, results[key])
+    return results
+
+
+def report(key, result):
+    line = '%-56s %12.0f ops/s' % (key, result['ops'])
+    if result['memory'] is not None:
+        line += '  %8d B peak %8.1f B/op kept' % (
+            result['memory']['peak'], result['memory']['kept'])
+    print(line)
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against ``baseline`` and return the keys of the
+    benchmarks that got slower by more than ``tolerance`` percent.
+    """
+    regressions = []
+    print('\nCompared to baseline:')
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        change = (results[key]['ops'] / baseline[key]['ops'] - 1) * 100
+        flag = ''
+        if change < -tolerance:
+            regressions.append(key)
+            flag = '  REGRESSION'
+        print('%-56s %+7.1f%%%s' % (key, change, flag))
+    return regressions
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options] [module ...]')
+    parser.add_option('--save', action='store_true',
+                      help='save the results as the new baseline')
+    parser.add_option('--compare', action='store_true',
+                      help='compare against the baseline, and exit with '
+                           'status 1 if anything got slower')
+    parser.add_option('--tolerance', type='float', default=20,
+                      help='slowdown in percent that is not considered a '
+                           'regression (default: %default)')
+    options, modules = parser.parse_args()
+    if options.compare and not os.path.exists(BASELINE):
+        parser.error('there is no baseline to compare against; run with '
+                     '--save first')
+
+    results = run(modules or MODULES)
+
+    if options.compare:
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, options.tolerance):
+            sys.exit(1)
+    if options.save:
+        with open(BASELINE, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
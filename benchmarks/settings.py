@@ -0,0 +1,17 @@
+"""Minimal Django settings, enough to create requests and responses and
+render templates without a database or any other service.
+"""
+
+DEBUG = False
+TEMPLATE_DEBUG = False
+SECRET_KEY = 'benchmarks'
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+INSTALLED_APPS = ()
+TEMPLATE_CONTEXT_PROCESSORS = ()
+USE_I18N = False
+USE_TZ = False
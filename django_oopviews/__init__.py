@@ -7,4 +7,4 @@ def get_version():
     return v
 
 
-from base import *
\ No newline at end of file
+from .base import *
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""
+Support for views written as coroutines, for use with an asyncio based
+server.
+
+Only imported by ``base`` once it finds a coroutine function on a view, as
+it uses syntax that is not available on older Pythons.
+"""
+
+import asyncio
+import asyncio.coroutines
+import functools
+import inspect
+import time
+from inspect import isawaitable, iscoroutinefunction
+
+from django_oopviews.base import _copy_view
+
+
+def compile_async_invoker(func, before=None, after=None, view=None,
+                          record=None):
+    """Return a coroutine function that runs ``func`` wrapped inside the
+    ``before`` and ``after`` hooks, awaiting each of them if necessary.
+
+    Either of the hooks may be a plain function or a coroutine function.
+    The view function may be either as well; its result is awaited if it
+    turns out to be awaitable, so that e.g. a ``__before__`` coroutine can
+    be combined with synchronous view methods.
+
+    See ``base._compile_invoker`` regarding ``view``, and
+    ``timing.compile_timed_invoker`` regarding ``record``.
+    """
+    before_async = iscoroutinefunction(before)
+    after_async = iscoroutinefunction(after)
+    copy_view = _copy_view
+    if record is not None:
+        from django_oopviews.timing import clock
+
+    async def invoke(*args, **kwargs):
+        scoped = () if view is None else (copy_view(view),)
+        before_time = after_time = None
+        if record is not None:
+            start = clock()
+        if before is not None:
+            args = list(args)
+            response = before(*(scoped + (args, kwargs)))
+            if before_async:
+                response = await response
+            if record is not None:
+                end = clock()
+                before_time, start = end - start, end
+            if response:
+                if record is not None:
+                    record(before_time, None, None)
+                return response
+        response = func(*(scoped + tuple(args)), **kwargs)
+        if isawaitable(response):
+            response = await response
+        if record is not None:
+            end = clock()
+            view_time = end - start
+        if after is not None:
+            response = after(*(scoped + (response,)))
+            if after_async:
+                response = await response
+            if record is not None:
+                after_time = clock() - end
+        if record is not None:
+            record(before_time, view_time, after_time)
+        return response
+    return invoke
+
+
+def wrap_response_cache(options, invoke, backend, prefix):
+    """The coroutine version of ``ResponseCache.wrap_invoker``; see there.
+    """
+    from django_oopviews.cache import HIT, BUILD, WAIT
+
+    async def invoke_cached(*args, **kwargs):
+        base = options.make_key(prefix, args, kwargs)
+        if base is None:
+            return await invoke(*args, **kwargs)
+        key = options.vary_key(backend, base, args)
+        deadline = time.time() + options.lock_timeout
+        while True:
+            state, response = options.lookup(backend, key)
+            if state is not WAIT or time.time() > deadline:
+                break
+            await asyncio.sleep(0.05)
+        if state is HIT:
+            return response
+        try:
+            response = await invoke(*args, **kwargs)
+            options.store(backend, base, args, response)
+        finally:
+            if state is BUILD:
+                backend.delete(key + ':lock')
+        return response
+    return invoke_cached
+
+
+def wrap_single_flight(options, invoke):
+    """The coroutine version of ``SingleFlight.wrap_invoker``; see there.
+    """
+    from django_oopviews.cache import request_key
+    from django_oopviews.coalesce import share_response, _missing
+
+    flights = {}
+
+    async def invoke_coalesced(*args, **kwargs):
+        key = request_key(options.key, options.vary_on, args, kwargs)
+        if key is None:
+            return await invoke(*args, **kwargs)
+        loop = asyncio.get_event_loop()
+        flight = flights.get((loop, key))
+        if flight is None:
+            flight = flights[loop, key] = (loop.create_future(), args[0])
+            try:
+                response = await invoke(*args, **kwargs)
+            except Exception as e:
+                flight[0].set_exception(e)
+                flight[0].exception()    # do not complain if nobody waits
+                raise
+            else:
+                flight[0].set_result(response)
+                return response
+            finally:
+                del flights[loop, key]
+
+        future, leader = flight
+        try:
+            response = await asyncio.wait_for(asyncio.shield(future),
+                                              options.timeout)
+        except asyncio.TimeoutError:
+            response = _missing
+        response = share_response(response, leader, args[0])
+        if response is _missing:
+            return await invoke(*args, **kwargs)
+        return response
+    return invoke_coalesced
+
+
+def make_composite_call(view):
+    """Return the coroutine version of ``CompositeView.__call__``, bound
+    to ``view``.
+    """
+    from django_oopviews.composite import BranchTimeout, _run_branch
+
+    async def run_branch(loop, func, is_async, timeout, args, kwargs):
+        if is_async:
+            running = func(*args, **kwargs)
+        else:
+            running = loop.run_in_executor(
+                None, functools.partial(_run_branch, func, args, kwargs))
+        return await asyncio.wait_for(running, timeout)
+
+    async def call(request, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        args = (request,) + args
+        outcomes = await asyncio.gather(*[
+            run_branch(loop, func, is_async, timeout, args, kwargs)
+            for name, func, timeout, is_async in view._branches],
+            return_exceptions=True)
+        results, errors = {}, {}
+        for (name, _, _, _), outcome in zip(view._branches, outcomes):
+            results[name] = None
+            if isinstance(outcome, asyncio.TimeoutError):
+                errors[name] = BranchTimeout(name)
+            elif isinstance(outcome, BaseException):
+                errors[name] = outcome
+            else:
+                results[name] = outcome
+        return view._merge(request, results, errors)
+    return call
+
+
+def wrap_bulkhead(options, invoke):
+    """The coroutine version of ``Bulkhead.wrap_invoker``; queued calls
+    poll for a free slot.
+    """
+    from django_oopviews.bulkhead import ACQUIRED, QUEUED
+
+    async def invoke_limited(*args, **kwargs):
+        state = options.enter()
+        if state is QUEUED:
+            deadline = time.time() + options.queue_timeout
+            while not options.leave_queue():
+                if time.time() > deadline:
+                    options.give_up()
+                    return options.reject(*args, **kwargs)
+                await asyncio.sleep(0.01)
+        elif state is not ACQUIRED:
+            return options.reject(*args, **kwargs)
+        try:
+            return await invoke(*args, **kwargs)
+        finally:
+            options.release()
+    return invoke_limited
+
+
+def make_method_dispatcher(invokers, allowed):
+    """The coroutine version of the function returned by
+    ``MethodDispatch.compile``; the invokers may be plain functions or
+    coroutine functions.
+    """
+    from django_oopviews.methods import method_not_handled
+    allow = ', '.join(allowed)
+
+    async def dispatch(request, *args, **kwargs):
+        invoke = invokers.get(request.method)
+        if invoke is None:
+            return method_not_handled(request, allowed, allow)
+        response = invoke(request, *args, **kwargs)
+        if isawaitable(response):
+            response = await response
+        return response
+    return dispatch
+
+
+def wrap_conditional(invoke, etag_func, last_modified_func):
+    """The coroutine version of ``conditional.wrap_conditional``; the
+    hooks may be coroutine functions as well.
+    """
+    from django_oopviews.conditional import evaluate_conditions, \
+        set_validators
+
+    async def invoke_conditional(*args, **kwargs):
+        request = args[0] if args else None
+        if getattr(request, 'method', None) not in ('GET', 'HEAD'):
+            return await invoke(*args, **kwargs)
+        etag = last_modified = None
+        if etag_func is not None:
+            etag = etag_func(*args, **kwargs)
+            if isawaitable(etag):
+                etag = await etag
+        if last_modified_func is not None:
+            last_modified = last_modified_func(*args, **kwargs)
+            if isawaitable(last_modified):
+                last_modified = await last_modified
+        etag, last_modified, response = evaluate_conditions(
+            request, etag, last_modified)
+        if response is None:
+            response = await invoke(*args, **kwargs)
+        return set_validators(response, etag, last_modified)
+    return invoke_conditional
+
+
+def mark_coroutine_function(obj):
+    """Make ``obj``, usually a callable proxy, pass the
+    ``iscoroutinefunction`` checks that e.g. Django uses to decide whether
+    a view needs to be awaited.
+    """
+    marker = getattr(asyncio.coroutines, '_is_coroutine', None)
+    if marker is not None:
+        obj._is_coroutine = marker
+    # Python 3.12+
+    marker = getattr(inspect, '_is_coroutine_mark', None)
+    if marker is not None:
+        obj._is_coroutine_marker = marker
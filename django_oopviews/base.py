@@ -81,6 +81,19 @@ TODO:
             pass
 """
 
+import threading
+import weakref
+from inspect import isgeneratorfunction
+from types import FunctionType
+
+try:
+    from inspect import iscoroutinefunction
+except ImportError:
+    # no native coroutines before Python 3.5
+    def iscoroutinefunction(func):
+        return False
+
+
 __all__ = ('create_view', 'View')
 
 
@@ -88,14 +101,59 @@ class BaseView(object):
     """
     The Base-class for OOPViews. Inherit it and overwrite the __init__,
     __call__ and/or __after__ and __before__ methods.
+
+    A ``__setup__`` method, if defined, is called without arguments right
+    after ``__init__`` when the proxy is created, and can be used to
+    precompute anything that does not depend on the request.
+
+    By default, all calls through a proxy share the single instance that
+    ``create_view`` constructed, so anything ``__before__`` stores on
+    ``self`` is visible to concurrently running requests. Set
+    ``request_scoped`` to ``True`` to have every call run against a
+    shallow copy of that instance instead: ``__init__`` still only runs
+    once, but attributes assigned during a request stay private to it.
+    Note that mutable objects created in ``__init__`` are still shared
+    between the copies.
+
+    Views may also define ``__etag__`` and/or ``__last_modified__`` hooks,
+    which are called with the arguments of the view before anything else
+    runs, to answer conditional GET requests with a 304 response; see the
+    ``conditional`` module.
+
+    Instead of overriding ``__call__``, views can define methods named
+    after the HTTP methods they handle, like ``get`` and ``post``; see the
+    ``methods`` module.
+
+    Methods that are generator functions have the iterator they return
+    wrapped in a streaming response, which ``__after__`` can add headers
+    to, or transform with ``streaming.map_chunks``. Set
+    ``stream_iterators`` to have any iterator returned by a method wrapped
+    like this.
+
+    To cache the responses of all of the view's methods, set
+    ``response_cache`` to a ``cache.ResponseCache``; to have identical
+    concurrent calls share a single response, set ``single_flight`` to a
+    ``coalesce.SingleFlight``. To limit how many calls run at once, set
+    ``concurrency_limit`` to a ``bulkhead.Bulkhead``. To measure how long
+    its hooks and methods take, set ``timings``; see the ``timing``
+    module. To be able to profile it at runtime, set ``profiling``; see
+    the ``profiling`` module.
     """
 
+    request_scoped = False
+    response_cache = None
+    single_flight = None
+    concurrency_limit = None
+    timings = None
+    profiling = None
+    stream_iterators = False
+
     def __call__(self, request, *args, **kwargs):
         """
         This is the method where you want to put the part of your code, that
         is absolutely view-specific.
         """
-        raise RuntimeError, "You have to override BaseView's __call__ method"
+        raise RuntimeError("You have to override BaseView's __call__ method")
 
 View = BaseView
 
@@ -103,24 +161,288 @@ View = BaseView
 class InvocationProxyBase(object):
     """Used as a base class for all the classes created by the
     ``InvocationProxyMaker`` metaclass.
+
+    The view's methods and nested views are only wrapped when they are
+    first accessed through the proxy; the result is then stored on the
+    proxy class, so that later lookups find it directly. Proxies do not
+    have any state of their own.
     """
 
-    def _call_view(self, func, args, kwargs):
-        """Used by the proxy whenever it needs to execute a view.
+    __slots__ = ()
 
-        Makes sure the pre- and post-processing runs.
-        """
-        if self.__before__ is not None:
+    def __getattr__(self, name):
+        # only called for names that have not been resolved yet; wrapping
+        # an attribute twice in a race does not hurt, as nested views are
+        # cached by ``InvocationProxyMaker.make``
+        proxy_class = type(self)
+        spec = proxy_class._spec
+        attr = spec.lookup(name)
+        if attr is None:
+            raise AttributeError(name)
+        setattr(proxy_class, name, spec.wrap(name, attr))
+        return getattr(self, name)
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self._spec.names()))
+
+
+_make_lock = threading.RLock()
+
+#: All proxy classes created by ``InvocationProxyMaker``, including those
+#: of nested views, so that ``warmup`` can find them.
+_proxy_classes = weakref.WeakSet()
+
+
+def _is_view_class(obj):
+    return isinstance(obj, type) and issubclass(obj, BaseView)
+
+
+def _compile_invoker(func, before=None, after=None, view=None):
+    """Return a function that runs the view function ``func`` wrapped
+    inside the given ``before`` and ``after`` hooks.
+
+    This is done once, when the proxy is created, and the result is
+    specialized for the hooks that actually exist, so that a call through
+    the proxy does not pay for checking them over and over again. If
+    there are none at all, ``func`` is called directly.
+
+    If ``view`` is given, the view is request scoped: ``func`` and the
+    hooks are expected to be unbound, and will be called with a fresh
+    copy of ``view`` as their first argument.
+    """
+    if view is not None:
+        return _compile_scoped_invoker(func, before, after, view)
+
+    if before is None and after is None:
+        invoke = func
+    elif before is None:
+        def invoke(*args, **kwargs):
+            return after(func(*args, **kwargs))
+    elif after is None:
+        def invoke(*args, **kwargs):
             args = list(args)
-            response = self.__before__(args, kwargs)
+            response = before(args, kwargs)
             if response:
                 return response
-            args = tuple(args)
-        response = func(*args, **kwargs)
-        if self.__after__ is None:
-            return response
+            return func(*args, **kwargs)
+    else:
+        def invoke(*args, **kwargs):
+            args = list(args)
+            response = before(args, kwargs)
+            if response:
+                return response
+            return after(func(*args, **kwargs))
+    return invoke
+
+
+def _compile_scoped_invoker(func, before, after, view):
+    """Like ``_compile_invoker``, but copies ``view`` for each call.
+    """
+    copy_view = _copy_view
+    if before is None and after is None:
+        def invoke(*args, **kwargs):
+            return func(copy_view(view), *args, **kwargs)
+    elif before is None:
+        def invoke(*args, **kwargs):
+            scoped = copy_view(view)
+            return after(scoped, func(scoped, *args, **kwargs))
+    elif after is None:
+        def invoke(*args, **kwargs):
+            scoped = copy_view(view)
+            args = list(args)
+            response = before(scoped, args, kwargs)
+            if response:
+                return response
+            return func(scoped, *args, **kwargs)
+    else:
+        def invoke(*args, **kwargs):
+            scoped = copy_view(view)
+            args = list(args)
+            response = before(scoped, args, kwargs)
+            if response:
+                return response
+            return after(scoped, func(scoped, *args, **kwargs))
+    return invoke
+
+
+def _compile_async_invoker(func, before=None, after=None, view=None,
+                           record=None):
+    """Like ``_compile_invoker``, but returns a coroutine function that
+    awaits the view function and hooks as necessary.
+    """
+    # only importable where ``async def`` is valid syntax
+    from django_oopviews._async import compile_async_invoker
+    return compile_async_invoker(func, before, after, view, record)
+
+
+def _compile_timed_invoker(func, before=None, after=None, view=None,
+                           record=None):
+    from django_oopviews.timing import compile_timed_invoker
+    return compile_timed_invoker(func, before, after, view, record)
+
+
+def _copy_view(view):
+    """Return a shallow copy of a view instance without running
+    ``__init__``; considerably cheaper than ``copy.copy``.
+    """
+    cls = view.__class__
+    clone = cls.__new__(cls)
+    clone.__dict__.update(view.__dict__)
+    return clone
+
+
+def _unbind(func, view):
+    """Turn an attribute of ``view`` into a function that expects the
+    view instance as first argument, so that it can be bound to a copy
+    of ``view`` at call time.
+    """
+    if getattr(func, '__self__', None) is view:
+        return func.__func__
+    # e.g. a staticmethod or a callable attribute; there is nothing to
+    # bind, so just ignore the instance.
+    return lambda view, *args, **kwargs: func(*args, **kwargs)
+
+
+#: The methods that handle requests of the HTTP method of the same name,
+#: for views that do not override ``__call__``; see the ``methods`` module.
+HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete', 'head', 'options')
+
+
+def _has_method_handlers(view):
+    call = type(view).__call__
+    if getattr(call, '__func__', call) is not BaseView.__dict__['__call__']:
+        return False
+    for name in HTTP_METHODS:
+        if callable(getattr(view, name, None)):
+            return True
+    return False
+
+
+#: Names of the attributes that may hold options changing how the methods
+#: of a view are invoked, e.g. caching their responses. Each is looked up
+#: on the method itself first, then on the view, and if set, its
+#: ``wrap_invoker(invoke, view, name)`` method is used to wrap the
+#: invoker. Options listed first end up innermost.
+invoker_options = ['concurrency_limit', 'response_cache', 'single_flight']
+
+
+def _wrap_invoker(invoke, func, view, name):
+    for option in invoker_options:
+        options = getattr(func, option, _missing)
+        if options is _missing:
+            options = getattr(view, option, None)
+        if options is not None:
+            invoke = options.wrap_invoker(invoke, view, name)
+    return invoke
+
+
+_missing = object()
+
+
+class _ProxySpec(object):
+    """Wraps the attributes of a view instance for its proxy, as they are
+    accessed.
+    """
+
+    def __init__(self, view):
+        self.view = view
+        self.before = getattr(view, '__before__', None)
+        self.after = getattr(view, '__after__', None)
+        self.etag = getattr(view, '__etag__', None)
+        self.last_modified = getattr(view, '__last_modified__', None)
+        self.hooks_async = iscoroutinefunction(self.before) or \
+            iscoroutinefunction(self.after) or \
+            iscoroutinefunction(self.etag) or \
+            iscoroutinefunction(self.last_modified)
+        self.timings = getattr(view, 'timings', None)
+        self.profiling = getattr(view, 'profiling', None)
+        self.stream_iterators = getattr(view, 'stream_iterators', False)
+
+        self.methods = None
+        if _has_method_handlers(view):
+            from django_oopviews.methods import MethodDispatch
+            self.methods = MethodDispatch(view)
+
+        self.scope = None
+        if getattr(view, 'request_scoped', False):
+            self.scope = view
+            self.before = self.before and _unbind(self.before, view)
+            self.after = self.after and _unbind(self.after, view)
+
+    def names(self):
+        """Return the names of all attributes of the view that are
+        available through the proxy.
+        """
+        return [name for name in dir(self.view)
+                if self.lookup(name) is not None]
+
+    def lookup(self, name):
+        """Return the view's attribute ``name`` if it is available through
+        the proxy, i.e. if it is a public method or nested view, or None.
+        """
+        if name.startswith('_') and name != '__call__':
+            return None
+        attr = getattr(self.view, name, None)
+        if callable(attr):
+            return attr
+        return None
+
+    def wrap(self, name, attr=None):
+        """Return what the proxy class needs for the view's attribute
+        ``name`` (``attr``, if it has been looked up already): a proxy for
+        nested views, the invoker (as a static method) for methods.
+        Raises an AttributeError if ``name`` is not available through the
+        proxy.
+        """
+        if attr is None:
+            attr = self.lookup(name)
+            if attr is None:
+                raise AttributeError(name)
+        if _is_view_class(attr):
+            return InvocationProxyMaker.make(attr)
+        invoke = self.compile(name, attr)
+        if isinstance(invoke, FunctionType):
+            return staticmethod(invoke)
+        # bound methods and the like are not rebound when accessed
+        # through the proxy, and can do without the extra wrapper
+        return invoke
+
+    def compile(self, name, attr):
+        if name == '__call__' and self.methods is not None:
+            return self.methods.compile(self)
+        before, after, scope = self.before, self.after, self.scope
+        func = attr
+        if scope is not None:
+            func = _unbind(attr, self.view)
+        pool = getattr(attr, 'process_pool', None)
+        if pool is not None:
+            func = pool.wrap(func, name, scope)
+        if self.stream_iterators or isgeneratorfunction(attr):
+            from django_oopviews.streaming import wrap_iterators
+            func = wrap_iterators(func)
+        if self.hooks_async or iscoroutinefunction(attr):
+            make_invoker = _compile_async_invoker
+        elif self.timings:
+            make_invoker = _compile_timed_invoker
+        else:
+            make_invoker = _compile_invoker
+        if self.timings:
+            from django_oopviews.timing import get_recorder
+            record = get_recorder(self.timings, self.view.__class__, name)
+            invoke = make_invoker(func, before, after, scope, record)
         else:
-            return self.__after__(response)
+            invoke = make_invoker(func, before, after, scope)
+        invoke = _wrap_invoker(invoke, attr, self.view, name)
+        if self.profiling:
+            from django_oopviews.profiling import registry
+            profiling = self.profiling
+            if profiling is True:
+                profiling = registry
+            invoke = profiling.wrap_invoker(invoke, self.view, name)
+        if self.etag is not None or self.last_modified is not None:
+            from django_oopviews.conditional import wrap_conditional
+            invoke = wrap_conditional(invoke, self.etag, self.last_modified)
+        return invoke
 
 
 class InvocationProxyMaker(type):
@@ -138,29 +460,25 @@ class InvocationProxyMaker(type):
             raise RuntimeError('the __view__ attribute is required')
         view_instance = attrs.pop('__view__')
 
+        # give the view a chance to precompute whatever it can
+        setup = getattr(view_instance, '__setup__', None)
+        if setup is not None:
+            setup()
+
+        spec = attrs['_spec'] = _ProxySpec(view_instance)
         # transfer the special before, after methods
         attrs['__before__'] = getattr(view_instance, '__before__', None)
         attrs['__after__'] = getattr(view_instance, '__after__', None)
-
-        # transfer wrapped versions of all non-private methods
-        for attr_name in dir(view_instance):
-            if attr_name.startswith('_') and not attr_name in ('__call__',):
-                continue
-            attr = getattr(view_instance, attr_name)
-
-            if isinstance(attr, type) and issubclass(attr, BaseView):
-                attrs[attr_name] = cls.make(attr)
-
-            elif callable(attr):
-                def make_wrapped(func):
-                    def wrapped(self, *args, **kwargs):
-                        # ``_call_view`` is expected to be defined by the bases
-                        return self._call_view(func, args, kwargs)
-                    return wrapped
-                attrs[attr_name] = make_wrapped(attr)
+        attrs['_instance'] = view_instance
+        # calling the proxy does not go through ``__getattr__``
+        attrs['__call__'] = spec.wrap('__call__')
+        attrs['__slots__'] = ()
 
         result = type(name, bases, attrs)
-        setattr(result, '_instance', view_instance)
+        if iscoroutinefunction(result.__call__):
+            # let servers see that calling the proxy returns a coroutine
+            from django_oopviews._async import mark_coroutine_function
+            mark_coroutine_function(result)
         return result
 
     @classmethod
@@ -175,6 +493,14 @@ class InvocationProxyMaker(type):
         Additional arguments given besides ``view_class`` will be passed
         on to the class constructor.
 
+        Proxies are cached on the view class: calling ``create_view``
+        again with the same class and (hashable) arguments returns the
+        proxy that was created the first time, without running
+        ``__init__`` again. In particular, a view nested in several
+        others is only instantiated once. Arguments only count as the
+        same if they have the same type, too, e.g. ``1`` and ``True`` do
+        not.
+
         .. note:: Why the manual ``create_view`` call is necessary.
            After all, a metaclass could be used to make each ``BaseView``
            subclass directly return a usuable proxy object.
@@ -194,9 +520,38 @@ class InvocationProxyMaker(type):
            would go through pre-/post-processing for each inheritance
            level, which is not how it's supposed to work.
         """
+        try:
+            key = (_typed_key(args), tuple(sorted(
+                (name, _typed_key(value)) for name, value in kwargs.items())))
+            hash(key)
+        except TypeError:
+            return cls._make(view_class, args, kwargs)
+
+        with _make_lock:
+            proxies = view_class.__dict__.get('_proxies')
+            if proxies is None:
+                proxies = {}
+                setattr(view_class, '_proxies', proxies)
+            proxy = proxies.get(key)
+            if proxy is None:
+                proxy = proxies[key] = cls._make(view_class, args, kwargs)
+        return proxy
+
+    @classmethod
+    def _make(cls, view_class, args, kwargs):
         dispatcher = cls("%sProxy" % view_class.__name__,
                          (InvocationProxyBase,),
                          {'__view__': view_class(*args, **kwargs)})
+        _proxy_classes.add(dispatcher)
         return dispatcher()
 
+def _typed_key(value):
+    """Return ``value`` for use in a key that tells apart values which
+    compare equal, but are of different types, like ``1`` and ``1.0``.
+    """
+    if isinstance(value, tuple):
+        return tuple, tuple([_typed_key(item) for item in value])
+    return type(value), value
+
+
 create_view = InvocationProxyMaker.make
\ No newline at end of file
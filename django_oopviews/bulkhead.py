@@ -0,0 +1,146 @@
+"""
+Limiting the number of concurrent calls of a view ("bulkheads").
+
+If a slow view ties up all the threads of a server, requests for every
+other view have to wait as well. With a ``Bulkhead`` set as
+``concurrency_limit`` on a view class (for all of its methods together) or
+given to the ``limit_concurrency`` decorator (for a single method), at most
+``max_concurrent`` calls run at once:
+
+    class SearchView(View):
+        concurrency_limit = Bulkhead(max_concurrent=4, max_queue=8,
+                                     queue_timeout=2)
+
+Up to ``max_queue`` further calls wait for up to ``queue_timeout``
+seconds for one of the running ones to finish; any others, and those that
+waited in vain, get a 503 response right away, without running the view
+or its hooks. Pass a function as ``reject`` to return something else; it
+is called with the view's arguments. Waiting calls are not served in the
+order they arrived: whichever notices a free slot first takes it.
+
+Like other options, a ``Bulkhead`` is inherited by subclasses, and then
+limits their calls and those of the class it is set on together. Set a
+``Bulkhead`` of its own on a subclass to limit it separately.
+
+Responses served from a ``ResponseCache`` and calls coalesced by
+``SingleFlight`` do not count against the limit. ``info()`` returns the
+number of calls currently running and waiting, and how many have been
+rejected.
+"""
+
+import threading
+import time
+
+from .base import iscoroutinefunction
+
+
+__all__ = ('Bulkhead', 'limit_concurrency',)
+
+
+ACQUIRED, QUEUED, REJECTED = 'acquired', 'queued', 'rejected'
+
+
+class Bulkhead(object):
+    """Options and state for limiting the concurrent calls of a view; see
+    the module documentation.
+    """
+
+    def __init__(self, max_concurrent=10, max_queue=0, queue_timeout=1,
+                 reject=None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.reject = reject or service_unavailable
+        self.active = self.waiting = self.rejected = 0
+        self._cond = threading.Condition(threading.RLock())
+
+    def wrap_invoker(self, invoke, view, name):
+        if iscoroutinefunction(invoke):
+            from django_oopviews._async import wrap_bulkhead
+            return wrap_bulkhead(self, invoke)
+
+        def invoke_limited(*args, **kwargs):
+            if not self.acquire():
+                return self.reject(*args, **kwargs)
+            try:
+                return invoke(*args, **kwargs)
+            finally:
+                self.release()
+        return invoke_limited
+
+    def acquire(self):
+        """Wait for a free slot; returns False if the call is rejected.
+        """
+        with self._cond:
+            state = self.enter()
+            if state is not QUEUED:
+                return state is ACQUIRED
+            deadline = time.time() + self.queue_timeout
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.give_up()
+                    return False
+                self._cond.wait(remaining)
+                if self.leave_queue():
+                    return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def enter(self):
+        """Take a free slot or a place in the queue; returns ``ACQUIRED``,
+        ``QUEUED`` or ``REJECTED``.
+        """
+        with self._cond:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                return ACQUIRED
+            if self.waiting < self.max_queue:
+                self.waiting += 1
+                return QUEUED
+            self.rejected += 1
+            return REJECTED
+
+    def leave_queue(self):
+        """For a queued call, take a slot if there is a free one."""
+        with self._cond:
+            if self.active < self.max_concurrent:
+                self.waiting -= 1
+                self.active += 1
+                return True
+            return False
+
+    def give_up(self):
+        """For a queued call, leave the queue after waiting in vain."""
+        with self._cond:
+            self.waiting -= 1
+            self.rejected += 1
+
+    def info(self):
+        """Return a dict with the current occupancy and the number of
+        rejected calls.
+        """
+        return {'active': self.active, 'waiting': self.waiting,
+                'rejected': self.rejected,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue}
+
+
+def service_unavailable(*args, **kwargs):
+    from django.http import HttpResponse
+    response = HttpResponse('Service Unavailable', status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+def limit_concurrency(**options):
+    """Decorator to limit the concurrent calls of a single view method;
+    takes the same arguments as ``Bulkhead``.
+    """
+    def decorator(func):
+        func.concurrency_limit = Bulkhead(**options)
+        return func
+    return decorator
@@ -0,0 +1,367 @@
+"""
+Small in-process caches used to avoid repeating per-request work.
+"""
+
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from .base import iscoroutinefunction
+
+
+__all__ = ('LRUCache', 'LocalCache', 'ResponseCache', 'cache_response',)
+
+
+_missing = object()
+
+
+class LRUCache(object):
+    """A thread-safe mapping that keeps at most ``maxsize`` entries,
+    discarding the least recently used ones first.
+
+    The number of ``hits`` and ``misses`` of ``get`` are counted.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.pop(key, _missing)
+            if value is _missing:
+                self.misses += 1
+                return default
+            # re-insert to mark as most recently used
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        """Return a dict with the cache's statistics."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'maxsize': self.maxsize, 'size': len(self._data)}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LocalCache(object):
+    """An in-memory cache backend with the same ``get``, ``set``, ``add``
+    and ``delete`` methods as Django's cache backends, so that either can
+    be used wherever a cache backend is expected.
+
+    Keeps at most ``maxsize`` entries; each one expires after the
+    ``timeout`` passed to ``set`` (in seconds), or the ``timeout`` given
+    here if none was passed. A timeout of None means forever.
+
+    Values are stored as they are, unless ``serialize`` is set, in which
+    case they are pickled so that every ``get`` returns a new copy.
+    """
+
+    def __init__(self, maxsize=1000, timeout=300, serialize=False):
+        self.timeout = timeout
+        self.serialize = serialize
+        self._entries = LRUCache(maxsize)
+        self._add_lock = threading.Lock()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires is not None and expires <= time.time():
+            self._entries.delete(key)
+            return default
+        if self.serialize:
+            return pickle.loads(value)
+        return value
+
+    def set(self, key, value, timeout=_missing):
+        if timeout is _missing:
+            timeout = self.timeout
+        expires = None
+        if timeout is not None:
+            expires = time.time() + timeout
+        if self.serialize:
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self._entries.set(key, (expires, value))
+
+    def add(self, key, value, timeout=_missing):
+        """Set ``key`` only if it is not already set; return whether it
+        was.
+        """
+        with self._add_lock:
+            if self.get(key, _missing) is not _missing:
+                return False
+            self.set(key, value, timeout)
+            return True
+
+    def delete(self, key):
+        self._entries.delete(key)
+
+    def clear(self):
+        self._entries.clear()
+
+    def info(self):
+        return self._entries.info()
+
+
+class ResponseCache(object):
+    """Options for caching the full responses of a view; a hit skips the
+    whole view, including its ``__before__`` and ``__after__`` hooks.
+
+    Set an instance as ``response_cache`` on a view class to cache all
+    of its methods, or use the ``cache_response`` decorator for single
+    ones:
+
+        class BookView(View):
+            response_cache = ResponseCache(timeout=60)
+
+            @cache_response(timeout=600, vary_on=['Accept-Language'])
+            def by_author(self, request, id):
+                # ...
+
+    Only GET and HEAD requests are cached, and only responses with a
+    status of 200 that are not streamed, do not set cookies and are not
+    marked ``private`` or ``no-store`` by their ``Cache-Control``
+    header.
+
+    ``key`` may be a function that is called with the view's arguments
+    (including the request) and returns the key, or None if the response
+    should not be cached. By default, the full request URL (including the
+    host) and all arguments make up the key. Either way, the request
+    method and the request headers named in ``vary_on`` are added, as
+    well as those named in the ``Vary`` header of the responses cached
+    for the same key before, much like Django's cache middleware does.
+
+    ``backend`` can be any object with the API of Django's cache
+    backends; by default, a ``LocalCache`` of up to ``maxsize`` responses
+    is created for every view method.
+
+    When an entry expires, it is kept for another ``stale`` seconds.
+    During that time only a single request rebuilds it, while all others
+    keep getting the old response, instead of all of them running the
+    view at once. Likewise, if there is no entry at all, only one request
+    builds it, and the others wait for up to ``lock_timeout`` seconds for
+    it to appear.
+    """
+
+    def __init__(self, timeout=300, key=None, vary_on=(), backend=None,
+                 maxsize=1000, stale=30, lock_timeout=10):
+        self.timeout = timeout
+        self.key = key
+        self.vary_on = [_header_meta_key(h) for h in vary_on]
+        self.backend = backend
+        self.maxsize = maxsize
+        self.stale = stale
+        self.lock_timeout = lock_timeout
+
+    def wrap_invoker(self, invoke, view, name):
+        backend = self.backend
+        if backend is None:
+            backend = LocalCache(self.maxsize, serialize=True)
+        prefix = 'oopviews.response:%s.%s.%s:' % (
+            view.__class__.__module__, view.__class__.__name__, name)
+        if iscoroutinefunction(invoke):
+            from django_oopviews._async import wrap_response_cache
+            return wrap_response_cache(self, invoke, backend, prefix)
+
+        def invoke_cached(*args, **kwargs):
+            base = self.make_key(prefix, args, kwargs)
+            if base is None:
+                return invoke(*args, **kwargs)
+            key = self.vary_key(backend, base, args)
+            deadline = time.time() + self.lock_timeout
+            while True:
+                state, response = self.lookup(backend, key)
+                if state is not WAIT or time.time() > deadline:
+                    break
+                time.sleep(0.05)
+            if state is HIT:
+                return response
+            try:
+                response = invoke(*args, **kwargs)
+                self.store(backend, base, args, response)
+            finally:
+                if state is BUILD:
+                    backend.delete(key + ':lock')
+            return response
+        return invoke_cached
+
+    def make_key(self, prefix, args, kwargs):
+        """Return the key for a call with the given arguments, not taking
+        the ``Vary`` header of earlier responses into account yet, or None
+        if it must not be cached.
+        """
+        key = request_key(self.key, self.vary_on, args, kwargs)
+        if key is None:
+            return None
+        # keep keys short and safe for e.g. memcached
+        return prefix + hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    def vary_key(self, backend, base, args):
+        """Return the key the response for a call is cached under, given
+        the ``base`` key from ``make_key``: the request headers that the
+        responses cached for it so far varied on are added.
+        """
+        headers = backend.get(base + ':vary')
+        if not headers:
+            return base
+        return _add_headers(base, headers, args[0])
+
+    def lookup(self, backend, key):
+        """Return a ``(state, response)`` tuple for ``key``:
+
+        ``HIT`` with the cached response, if it can be used; ``BUILD`` if
+        the caller has to run the view and has the lock to do so; ``WAIT``
+        if another one is already running it, and there is no cached
+        response in the meantime.
+        """
+        entry = backend.get(key)
+        if entry is not None:
+            expires, response = entry
+            if expires > time.time():
+                return HIT, response
+        if backend.add(key + ':lock', 1, self.lock_timeout):
+            return BUILD, None
+        if entry is not None:
+            return HIT, response    # stale, but being rebuilt
+        return WAIT, None
+
+    def store(self, backend, base, args, response):
+        if getattr(response, 'status_code', 200) != 200 or \
+                getattr(response, 'streaming', False) or \
+                getattr(response, '_base_content_is_iter', False) or \
+                is_private(response):
+            return
+        headers = vary_headers(response)
+        if headers is None:
+            return
+        timeout = self.timeout + self.stale
+        key = base
+        # responses for the same call may vary on different headers,
+        # so keep all of them
+        known = backend.get(base + ':vary') or []
+        headers = sorted(set(known) | set(headers))
+        if headers:
+            key = _add_headers(base, headers, args[0])
+            backend.set(base + ':vary', headers, timeout)
+        backend.set(key, (time.time() + self.timeout, response), timeout)
+
+
+HIT, BUILD, WAIT = 'hit', 'build', 'wait'
+
+
+def cache_response(**options):
+    """Decorator to cache the responses of a single view method; takes
+    the same arguments as ``ResponseCache``.
+    """
+    def decorator(func):
+        func.response_cache = ResponseCache(**options)
+        return func
+    return decorator
+
+
+def request_key(key_func, vary_on, args, kwargs):
+    """Return a string identifying a view call with the given arguments,
+    the first of which is the request, or None if the request is not a GET
+    or HEAD request, or ``key_func`` returns None.
+
+    If given, ``key_func`` is called with the arguments to get the key;
+    by default, it is made up of the full request URL and the other
+    arguments. Either way, the request method and the values of the
+    headers whose ``request.META`` keys are listed in ``vary_on`` are
+    added.
+    """
+    request = args[0] if args else None
+    method = getattr(request, 'method', 'GET')
+    if method not in ('GET', 'HEAD'):
+        return None
+    if key_func is not None:
+        key = key_func(*args, **kwargs)
+        if key is None:
+            return None
+    else:
+        if hasattr(request, 'build_absolute_uri'):
+            key = [request.build_absolute_uri()]
+        elif hasattr(request, 'get_full_path'):
+            key = [request.get_full_path()]
+        else:
+            key = [request]
+        key.extend(args[1:])
+        key.extend(sorted(kwargs.items()))
+    key = (method, key)
+    if vary_on:
+        meta = getattr(request, 'META', {})
+        key = (key, [meta.get(name) for name in vary_on])
+    return repr(key)
+
+
+def vary_headers(response):
+    """Return the ``request.META`` keys of the headers named in the
+    ``Vary`` header of ``response``, or None if it varies on everything.
+    """
+    vary = _get_header(response, 'Vary')
+    if not vary:
+        return []
+    headers = [h.strip() for h in vary.split(',') if h.strip()]
+    if '*' in headers:
+        return None
+    return sorted(set(_header_meta_key(h) for h in headers))
+
+
+def is_private(response):
+    """Return whether ``response`` is meant for a single client only, as
+    it sets cookies or is marked so by its ``Cache-Control`` header, and
+    so must not be cached or handed to other requests.
+    """
+    if getattr(response, 'cookies', None):
+        return True
+    cache_control = _get_header(response, 'Cache-Control')
+    if not cache_control:
+        return False
+    directives = set(d.split('=')[0].strip().lower()
+                     for d in cache_control.split(','))
+    return bool(directives & set(['private', 'no-store']))
+
+
+def _get_header(response, header):
+    has_header = getattr(response, 'has_header', None)
+    if has_header is None or not has_header(header):
+        return None
+    return response[header]
+
+
+def _add_headers(key, headers, request):
+    meta = getattr(request, 'META', {})
+    values = repr([meta.get(name) for name in headers])
+    return '%s:%s' % (key, hashlib.md5(values.encode('utf-8')).hexdigest())
+
+
+def _header_meta_key(header):
+    """Return the ``request.META`` key for an HTTP header name."""
+    header = header.upper().replace('-', '_')
+    if header not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+        header = 'HTTP_' + header
+    return header
@@ -0,0 +1,150 @@
+"""
+Coalescing identical concurrent calls of a view ("single flight").
+
+When many requests for the same expensive page arrive at once, e.g. right
+after it dropped out of a cache, each of them would run the view on its
+own. With single flight enabled, only the first one does; the others wait
+for it to finish and get a copy of its response:
+
+    class BookView(View):
+        single_flight = SingleFlight(timeout=10)
+
+        @coalesce_calls(vary_on=['Accept-Language'])
+        def by_most_read(self, request, count):
+            # ...
+
+Set a ``SingleFlight`` as ``single_flight`` on a view class for all of its
+methods, or use the ``coalesce_calls`` decorator for single ones. Calls are
+identical if they have the same key, which is built like the one of
+``cache.ResponseCache``: only GET and HEAD requests are coalesced, and by
+default the full request path and the view's arguments make up the key,
+plus the request method and the headers named in ``vary_on``.
+
+Responses that set cookies or are marked ``private`` or ``no-store`` by
+their ``Cache-Control`` header are not handed to the waiting calls, nor
+are those that vary on headers for which a waiting call has different
+values than the running one; these calls run the view themselves.
+
+If the running call raises an exception, it is raised in all the calls
+waiting for it as well. Those that have waited for ``timeout`` seconds
+give up and run the view themselves, as do those for which the response
+cannot be copied, e.g. because it is streamed. Coroutine views are
+coalesced with the calls running on the same event loop.
+"""
+
+import pickle
+import threading
+
+from .base import iscoroutinefunction
+from .cache import request_key, vary_headers, is_private, \
+    _header_meta_key
+
+
+__all__ = ('SingleFlight', 'coalesce_calls',)
+
+
+_missing = object()
+
+
+class SingleFlight(object):
+    """Options for coalescing identical concurrent calls of a view; see the
+    module documentation.
+    """
+
+    def __init__(self, key=None, vary_on=(), timeout=30):
+        self.key = key
+        self.vary_on = [_header_meta_key(h) for h in vary_on]
+        self.timeout = timeout
+
+    def wrap_invoker(self, invoke, view, name):
+        if iscoroutinefunction(invoke):
+            from django_oopviews._async import wrap_single_flight
+            return wrap_single_flight(self, invoke)
+
+        flights = {}
+        lock = threading.Lock()
+
+        def invoke_coalesced(*args, **kwargs):
+            key = request_key(self.key, self.vary_on, args, kwargs)
+            if key is None:
+                return invoke(*args, **kwargs)
+            with lock:
+                flight = flights.get(key)
+                if flight is None:
+                    flight = flights[key] = _Flight(args[0])
+                    leader = True
+                else:
+                    leader = False
+
+            if leader:
+                try:
+                    flight.response = invoke(*args, **kwargs)
+                    return flight.response
+                except Exception as e:
+                    flight.error = e
+                    raise
+                finally:
+                    with lock:
+                        del flights[key]
+                    flight.done.set()
+
+            flight.done.wait(self.timeout)
+            if flight.error is not None:
+                raise flight.error
+            response = share_response(flight.response, flight.request,
+                                      args[0])
+            if response is _missing:
+                return invoke(*args, **kwargs)
+            return response
+        return invoke_coalesced
+
+
+class _Flight(object):
+    __slots__ = ('request', 'done', 'response', 'error')
+
+    def __init__(self, request):
+        self.request = request
+        self.done = threading.Event()
+        self.response = _missing
+        self.error = None
+
+
+def share_response(response, leader, request):
+    """Return a copy of the ``response`` the call with the ``leader``
+    request got, for a waiting call with ``request``, or ``_missing`` if
+    it must not be shared with it.
+    """
+    if response is _missing or is_private(response):
+        return _missing
+    headers = vary_headers(response)
+    if headers is None:
+        return _missing
+    leader_meta = getattr(leader, 'META', {})
+    meta = getattr(request, 'META', {})
+    for name in headers:
+        if leader_meta.get(name) != meta.get(name):
+            return _missing
+    return copy_response(response)
+
+
+def copy_response(response):
+    """Return a copy of ``response`` to hand out to a waiting call, or
+    ``_missing`` if there is none, or it cannot be copied.
+    """
+    if response is _missing or getattr(response, 'streaming', False) or \
+            getattr(response, '_base_content_is_iter', False):
+        return _missing
+    try:
+        return pickle.loads(pickle.dumps(response, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return _missing
+
+
+def coalesce_calls(**options):
+    """Decorator to coalesce the calls of a single view method; takes the
+    same arguments as ``SingleFlight``.
+    """
+    def decorator(func):
+        func.single_flight = SingleFlight(**options)
+        return func
+    return decorator
@@ -0,0 +1,150 @@
+"""
+Views composed of several other views or methods, which run concurrently.
+
+A page assembled from the results of several independent parts, each of
+which mostly waits for a database or another service, takes as long as all
+of them together if they are called one after the other. A
+``CompositeView`` runs them at the same time instead:
+
+    class DashboardView(CompositeView):
+        branches = {'news': 2, 'stats': None}
+
+        class news(View):
+            def __call__(self, request):
+                return fetch_news()
+
+        def stats(self, request):
+            return fetch_stats()
+
+        def _merge(self, request, results, errors):
+            return render_to_response('dashboard.html', results)
+
+``branches`` names the nested views and methods of the view to run; each
+is called with the arguments the composite view was called with. It is
+either a list of names, or a dict mapping names to a timeout in seconds
+(None for no timeout); ``branch_timeout`` applies otherwise. Nested views
+are called through their proxies, so that their own hooks run; methods are
+called directly.
+
+Once all branches are done or timed out, ``_merge`` is called with a dict
+mapping the branch names to their results, and another one mapping the
+names of those that failed to the exception they raised, or to a
+``BranchTimeout``. The results of these are None. By default, ``_merge``
+returns the results, e.g. for ``__after__`` to render.
+
+Branches run on a pool of ``branch_pool_size`` threads that is shared by
+all calls of the view class. If any branch is a coroutine function, the
+view itself becomes one and runs all branches on its event loop instead,
+with the plain ones in the loop's default executor. A branch that times
+out is not interrupted; only its result is not waited for.
+
+As these threads never see the end of a request, the plain branches close
+the database connections Django would close then, before and after they
+run.
+"""
+
+import threading
+from multiprocessing import TimeoutError
+from multiprocessing.pool import ThreadPool
+
+from .base import View, create_view, iscoroutinefunction, _is_view_class
+from .timing import clock
+
+
+__all__ = ('CompositeView', 'BranchTimeout',)
+
+
+class BranchTimeout(Exception):
+    """Reported for a branch that did not finish in time."""
+
+
+class CompositeView(View):
+    """Runs the views and methods named in ``branches`` concurrently, and
+    merges their results; see the module documentation.
+    """
+
+    branches = ()
+    branch_timeout = 10
+    branch_pool_size = 10
+
+    def __setup__(self):
+        self._branches = []
+        timeouts = self.branches
+        if not isinstance(timeouts, dict):
+            timeouts = dict.fromkeys(self.branches, self.branch_timeout)
+        for name, timeout in sorted(timeouts.items()):
+            func = getattr(self, name)
+            if _is_view_class(func):
+                func = create_view(func)
+            is_async = iscoroutinefunction(func) or \
+                iscoroutinefunction(getattr(func, '__call__', None))
+            self._branches.append((name, func, timeout, is_async))
+        if any(branch[3] for branch in self._branches):
+            from django_oopviews._async import make_composite_call
+            # picked up by the proxy as the view's ``__call__``
+            self.__call__ = make_composite_call(self)
+
+    def __call__(self, request, *args, **kwargs):
+        branches = self.__dict__.get('_branches')
+        if branches is None:
+            # not set up through ``create_view``
+            self.__setup__()
+            branches = self._branches
+        pool = self._get_branch_pool()
+        args = (request,) + args
+        start = clock()
+        pending = [(name, pool.apply_async(_run_branch, (func, args, kwargs)),
+                    timeout)
+                   for name, func, timeout, is_async in branches]
+        results, errors = {}, {}
+        for name, result, timeout in pending:
+            results[name] = None
+            if timeout is not None:
+                timeout = max(0, start + timeout - clock())
+            try:
+                results[name] = result.get(timeout)
+            except TimeoutError:
+                errors[name] = BranchTimeout(name)
+            except Exception as e:
+                errors[name] = e
+        return self._merge(request, results, errors)
+
+    def _merge(self, request, results, errors):
+        """Return the view's response, given the ``results`` of all
+        branches, and the ``errors`` of those that failed.
+        """
+        return results
+
+    @classmethod
+    def _get_branch_pool(cls):
+        pool = cls.__dict__.get('_branch_pool')
+        if pool is None:
+            with _pool_lock:
+                pool = cls.__dict__.get('_branch_pool')
+                if pool is None:
+                    pool = cls._branch_pool = ThreadPool(cls.branch_pool_size)
+        return pool
+
+
+_pool_lock = threading.Lock()
+
+
+def _run_branch(func, args, kwargs):
+    """Call the branch ``func`` in a worker thread."""
+    _close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _close_old_connections()
+
+
+def _close_old_connections():
+    try:
+        from django.db import close_old_connections
+    except ImportError:
+        try:
+            # before Django 1.6, connections are closed after each request
+            from django.db import close_connection as close_old_connections
+        except ImportError:
+            return
+    close_old_connections()
@@ -0,0 +1,125 @@
+"""
+Conditional GET support for views that define an ``__etag__`` or
+``__last_modified__`` hook.
+
+Both hooks are called with the same arguments as the view method itself,
+before ``__before__`` runs:
+
+    class ArticleView(View):
+        def __last_modified__(self, request, slug):
+            return Article.objects.filter(slug=slug).values_list(
+                'updated', flat=True)[0]
+
+        def __call__(self, request, slug):
+            ...
+
+``__etag__`` returns a string, ``__last_modified__`` a ``datetime`` in
+UTC; either may return None if it cannot tell. For GET and HEAD requests,
+if the ``If-None-Match`` or ``If-Modified-Since`` header shows that the
+client's copy is current, a 304 response is returned and neither the view
+nor its ``__before__`` and ``__after__`` hooks run; as with RFC 7232,
+``If-Modified-Since`` is ignored if ``If-None-Match`` is given. Otherwise
+the response gets ``ETag`` and ``Last-Modified`` headers, unless it
+already has them; the ETag is weak if the response has a
+``Content-Encoding``. The hooks may be coroutine functions, making the
+view's methods coroutines as well.
+"""
+
+import calendar
+
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, \
+    quote_etag
+
+from .base import iscoroutinefunction
+
+
+__all__ = ('wrap_conditional',)
+
+
+def wrap_conditional(invoke, etag_func, last_modified_func):
+    """Return ``invoke`` wrapped so that it answers conditional requests
+    using the given hooks, either of which may be None.
+    """
+    if iscoroutinefunction(invoke):
+        from django_oopviews._async import wrap_conditional
+        return wrap_conditional(invoke, etag_func, last_modified_func)
+
+    def invoke_conditional(*args, **kwargs):
+        etag, last_modified, response = check_conditions(
+            etag_func, last_modified_func, args, kwargs)
+        if response is None:
+            response = invoke(*args, **kwargs)
+        return set_validators(response, etag, last_modified)
+    return invoke_conditional
+
+
+def check_conditions(etag_func, last_modified_func, args, kwargs):
+    """Return the ETag and last modified timestamp for a call with the
+    given arguments, and a 304 response if the client's copy is current.
+    """
+    request = args[0] if args else None
+    if getattr(request, 'method', None) not in ('GET', 'HEAD'):
+        return None, None, None
+    etag = last_modified = None
+    if etag_func is not None:
+        etag = etag_func(*args, **kwargs)
+    if last_modified_func is not None:
+        last_modified = last_modified_func(*args, **kwargs)
+    return evaluate_conditions(request, etag, last_modified)
+
+
+def evaluate_conditions(request, etag, last_modified):
+    """Return the ETag and last modified timestamp, given the values the
+    hooks returned for ``request``, and a 304 response if the client's
+    copy is current.
+    """
+    if last_modified is not None:
+        last_modified = calendar.timegm(last_modified.utctimetuple())
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_none_match:
+        # If-Modified-Since is ignored along with If-None-Match (RFC 7232)
+        not_modified = etag is not None and \
+            _etag_matches(etag, if_none_match)
+    elif if_modified_since and last_modified is not None:
+        if_modified_since = parse_http_date_safe(if_modified_since)
+        not_modified = if_modified_since is not None and \
+            last_modified <= if_modified_since
+    else:
+        not_modified = False
+
+    if not_modified:
+        return etag, last_modified, HttpResponseNotModified()
+    return etag, last_modified, None
+
+
+# Django 1.11+ keeps the quotes (and weakness indicators) of parsed ETags
+_QUOTED_ETAGS = parse_etags('"etag"') == ['"etag"']
+
+
+def _etag_matches(etag, if_none_match):
+    etags = parse_etags(if_none_match)
+    if '*' in etags:
+        return True
+    if _QUOTED_ETAGS:
+        etag = quote_etag(etag)
+        # If-None-Match uses the weak comparison
+        etags = [e[2:] if e.startswith('W/') else e for e in etags]
+    return etag in etags
+
+
+def set_validators(response, etag, last_modified):
+    if not hasattr(response, 'has_header'):
+        return response
+    if etag is not None and not response.has_header('ETag'):
+        etag = quote_etag(etag)
+        if response.has_header('Content-Encoding') and \
+                not etag.startswith('W/'):
+            # e.g. compressed by ``ctn``; not the identity variant
+            etag = 'W/' + etag
+        response['ETag'] = etag
+    if last_modified is not None and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    return response
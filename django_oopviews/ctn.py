@@ -37,11 +37,48 @@ will take the first element of that tuple as a priority value similar to the
 one used in the "Accept"-handling. This way, you can prioritize methods for
 the case, that the user requests any type of a given family like for instance
 'text/\*'.
+
+Instead of writing a method for every content type, which each have to
+load the same data, a view can load it once in ``_ctn_data`` and bind
+content types to the name of a renderer instead of a method. Renderers are
+looked up in ``ctn_renderers``, which by default has ``json`` and ``xml``
+ones; methods and renderers may be mixed::
+
+    class BookView(ctn.AbstractCTNView):
+        ctn_accept_binding = {
+            'text/html': 'html',
+            'application/json': 'json',
+            'application/xml': 'xml',
+            '*/*': 'html',
+        }
+
+        def _ctn_data(self, request, id):
+            return Book.objects.filter(id=id).values()[0]
+
+        def html(self, request, id):
+            # ...
+
+Set ``ctn_render_cache`` to a cache backend (like a ``cache.LocalCache``)
+to cache the rendered output, for ``ctn_render_timeout`` seconds, per
+content type, negotiated language and the key returned by
+``_ctn_data_key``. A hit skips loading the data as well as rendering it.
+By default, the key is made up of the request URL and the view's
+arguments, and only GET and HEAD requests are cached.
 """
 
+import hashlib
+import re
+import zlib
+from functools import cmp_to_key
+from types import FunctionType
+from xml.sax.saxutils import escape, quoteattr
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
 
 from .base import BaseView
+from .cache import LRUCache, request_key
 
 
 def provides_priority_sorting(a,b):
@@ -83,35 +120,371 @@ def accept_priority_sorting(a,b):
         return -1
     return 0
 
+def parse_qvalues(header):
+    """
+    Parse the value of an Accept, Accept-Encoding or Accept-Language
+    header into a list of ``(value, q)`` tuples, in the order given.
+
+    These headers are basically a list separated by "," with options
+    coming after the actual value and being separated by a ";" from it.
+    For now, all this handles is the q-parameter which handles the
+    priority of the value. If not set, this is set to 1; values with a q
+    that is not a number from 0 to 1 are left out.
+    """
+    values = []
+    for item in header.split(","):
+        info = item.split(";")
+        value = info[0].strip()
+        if not value:
+            continue
+        q = 1
+        for parameter in info[1:]:
+            parameter = parameter.strip()
+            if parameter.startswith("q="):
+                try:
+                    q = float(parameter[2:])
+                except ValueError:
+                    q = None
+                break
+        if q is None or not 0 <= q <= 1:
+            continue
+        values.append((value, q))
+    return values
+
+def negotiate_language(header, available):
+    """
+    Return the language of ``available`` preferred by the Accept-Language
+    ``header``, or the first one if none of them is acceptable. A request
+    for ``en-us`` is matched by ``en``, and vice versa.
+    """
+    if header:
+        languages = parse_qvalues(header.lower())
+        # sort() is stable, so equal priorities keep their order
+        languages.sort(key=lambda language: -language[1])
+        lowered = [(language.lower(), language) for language in available]
+        for requested, q in languages:
+            if q == 0:
+                break
+            if requested == '*':
+                return available[0]
+            prefix = requested.split('-')[0]
+            for candidate, language in lowered:
+                if candidate == requested:
+                    return language
+            for candidate, language in lowered:
+                if candidate.split('-')[0] == prefix:
+                    return language
+    return available[0]
+
+def negotiate_encoding(header, available):
+    """
+    Return the content coding of ``available`` (in order of preference)
+    with the highest priority in the Accept-Encoding ``header``, or None
+    if the response should not be encoded.
+    """
+    if not header:
+        return None
+    accepted = dict(parse_qvalues(header.lower()))
+    default = accepted.get('*', 0)
+    best, best_q = None, accepted.get('identity', default or 0.001)
+    for encoding in available:
+        q = accepted.get(encoding, default)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def compress(content, encoding, level=6):
+    """
+    Compress ``content`` (a byte string) for the ``gzip`` or ``deflate``
+    content coding.
+    """
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(level, zlib.DEFLATED,
+                                      16 + zlib.MAX_WBITS)
+        return compressor.compress(content) + compressor.flush()
+    return zlib.compress(content, level)
+
 class HttpResponseNotAcceptable(HttpResponse):
     status_code = 406
 
+class NegotiationTable(object):
+    """
+    The ``ctn_accept_binding`` of a view class, compiled into lookup
+    tables so that the handler for a requested content type can be found
+    with a single dictionary lookup:
+
+    ``exact`` maps every bound content type (including wildcards like
+    ``text/*``) to the handler function, ``wildcard`` maps a content type
+    family (or ``*`` for ``*/*``) to the handler preferred for a request
+    of ``family/*``.
+
+    If ``cache_size`` is given, the outcome of the negotiation for the
+    most recently seen Accept headers is kept in ``cache``, an
+    ``LRUCache``. ``variants`` keeps the most recently compressed
+    responses.
+    """
+
+    def __init__(self, view_class, binding, cache_size=0):
+        self.binding = binding
+        self.cache = None
+        if cache_size:
+            self.cache = LRUCache(cache_size)
+        self.variants = LRUCache(view_class.ctn_variant_cache_size)
+        providing = []
+        for type_, value in binding.items():
+            if isinstance(value, (list, tuple)):
+                providing.append((type_, tuple(value)))
+            else:
+                providing.append((type_, (1, value)))
+        providing.sort(key=cmp_to_key(provides_priority_sorting))
+        providing.reverse()
+        self.providing = providing
+
+        self.exact = {}
+        self.wildcard = {}
+        renderers = view_class.ctn_renderers
+        for type_, (priority, name) in providing:
+            handler = _class_attribute(view_class, name)
+            if isinstance(handler, FunctionType):
+                pass    # a plain method, called with the view
+            elif handler is None and name in renderers:
+                handler = _renderer_handler(renderers[name], type_)
+            else:
+                # e.g. a staticmethod, or not defined on the class
+                handler = _instance_handler(name)
+            self.exact[type_] = handler
+            self.wildcard.setdefault(type_.split('/')[0], handler)
+
+    def lookup(self, types):
+        """
+        Return the handler for the first content type of ``types`` (as
+        returned by ``_ctn_build_request_priorities``) that can be
+        provided, or None.
+        """
+        exact, wildcard = self.exact, self.wildcard
+        for (type_, priority) in types:
+            (tfamily, sep, tspec) = type_.partition('/')
+            # If the requested type is a type-wildcard, we have to use the
+            # handler preferred for the family, otherwise a normal lookup
+            # (falling back to the family's wildcard binding) is enough.
+            if tspec == '*':
+                handler = wildcard.get(tfamily)
+            else:
+                handler = exact.get(type_) or exact.get(tfamily + '/*')
+            if handler is not None:
+                return handler
+        return None
+
+_missing = object()
+
+def _class_attribute(cls, name):
+    """
+    Return the attribute ``name`` of ``cls`` as it is defined, without
+    invoking descriptors like ``staticmethod``, or None.
+    """
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass.__dict__[name]
+    return None
+
+def _instance_handler(name):
+    """
+    Handler for a binding whose method is not found on the class, or is
+    not a plain function there; it is looked up on the instance on every
+    request instead.
+    """
+    def handler(view, *args, **kwargs):
+        return getattr(view, name)(*args, **kwargs)
+    return handler
+
+def _renderer_handler(renderer, type_):
+    """
+    Handler for a binding to a renderer: renders the data returned by the
+    view's ``_ctn_data`` as ``type_``, or the renderer's default content
+    type if ``type_`` is a wildcard.
+    """
+    if type_.endswith('/*'):
+        type_ = renderer.content_type
+    content_type = '%s; charset=utf-8' % type_
+
+    def handler(view, request, *args, **kwargs):
+        cache = view.ctn_render_cache
+        key = None
+        if cache is not None:
+            key = view._ctn_data_key(request, *args, **kwargs)
+        if key is not None:
+            key = 'oopviews.ctn:%s.%s:%s:%s:%s' % (
+                view.__class__.__module__, view.__class__.__name__, type_,
+                getattr(request, 'ctn_language', ''),
+                hashlib.md5(key.encode('utf-8')).hexdigest())
+            content = cache.get(key)
+            if content is not None:
+                return HttpResponse(content, content_type=content_type)
+        content = renderer.render(view._ctn_data(request, *args, **kwargs))
+        if key is not None:
+            cache.set(key, content, view.ctn_render_timeout)
+        return HttpResponse(content, content_type=content_type)
+    return handler
+
+class Renderer(object):
+    """
+    Encodes data for one content type: ``render`` is a function that
+    takes the data returned by a view's ``_ctn_data`` and returns a UTF-8
+    encoded string.
+    """
+
+    def __init__(self, content_type, render):
+        self.content_type = content_type
+        self.render = render
+
+def render_json(data):
+    return _json_encoder.encode(data).encode('utf-8')
+
+_json_encoder = DjangoJSONEncoder(separators=(',', ':'))
+
+def render_xml(data, root='response'):
+    """
+    Render dicts as elements named after their keys, lists and tuples as
+    ``item`` elements, and everything else as text; None as an empty
+    element. Dict keys that are not valid element names become ``item``
+    elements with the key as ``key`` attribute.
+    """
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n']
+    _append_xml(parts, root, data)
+    return ''.join(parts).encode('utf-8')
+
+_xml_name = re.compile(r'^[^\W\d][\w.-]*$', re.UNICODE)
+
+def _append_xml(parts, tag, data, attrs=''):
+    if data is None:
+        parts.append('<%s%s/>' % (tag, attrs))
+        return
+    parts.append('<%s%s>' % (tag, attrs))
+    if isinstance(data, dict):
+        for key, value in data.items():
+            key = _text(key)
+            if _xml_name.match(key):
+                _append_xml(parts, key, value)
+            else:
+                _append_xml(parts, 'item', value, ' key=%s' % quoteattr(key))
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            _append_xml(parts, 'item', value)
+    elif isinstance(data, bool):
+        parts.append(data and 'true' or 'false')
+    else:
+        parts.append(escape(_text(data)))
+    parts.append('</%s>' % tag)
+
+try:
+    _text = unicode
+except NameError:
+    _text = str
+
+#: The renderers available to all views, by name.
+renderers = {
+    'json': Renderer('application/json', render_json),
+    'xml': Renderer('application/xml', render_xml),
+}
+
+def register_renderer(name, content_type, render):
+    """
+    Make a renderer available to all views as ``name``; see ``Renderer``.
+    """
+    renderers[name] = Renderer(content_type, render)
+
 class AbstractCTNView(BaseView):
+    """
+    Set ``ctn_cache_size`` to the number of distinct Accept headers for
+    which the negotiated handler should be remembered, or to 0 to parse
+    and negotiate every request. Statistics of the cache are available
+    through ``_ctn_cache_info()``.
+
+    Bindings to renderers use ``ctn_renderers``, and ``_ctn_data``; see
+    the module documentation.
+
+    To negotiate the language as well, list the languages the view can
+    provide in ``ctn_languages``, the first being the default; the one
+    chosen is set as ``request.ctn_language`` before the handler is
+    called.
+
+    To have responses compressed, list the content codings to use in
+    ``ctn_encodings``, e.g. ``('gzip', 'deflate')``. Successful responses
+    of at least ``ctn_compress_min_size`` bytes are then compressed with
+    ``zlib``, if the client accepts it. The compressed variants of the
+    last ``ctn_variant_cache_size`` responses are kept, so that sending
+    the same content again, e.g. from a ``ctn_render_cache``, does not
+    compress it again. The ``ETag`` of compressed responses is made weak,
+    as Django's ``GZipMiddleware`` does.
+
+    The ``Vary`` header of responses is set according to the request
+    headers used.
+    """
+
     ctn_accept_binding = {'*/*': 'default'}
+    ctn_cache_size = 256
+    ctn_renderers = renderers
+    ctn_render_cache = None
+    ctn_render_timeout = 300
+    ctn_languages = ()
+    ctn_encodings = ()
+    ctn_compress_level = 6
+    ctn_compress_min_size = 200
+    ctn_variant_cache_size = 64
 
     def __init__(self):
         if (self.__class__ is AbstractCTNView):
-            raise TypeError, "AbstractContentSelectView is an abstract class"
+            raise TypeError("AbstractContentSelectView is an abstract class")
+
+    def __setup__(self):
+        # build the table when the proxy is created, not on first request
+        self._ctn_get_table()
 
     def __before__(self, args, kwargs):
         self._ctn_request_priorities = None
-        self._ctn_provides_priorities = None
 
-    def _ctn_build_provides_priorities(self):
+    @classmethod
+    def _ctn_get_table(cls):
+        """
+        Return the ``NegotiationTable`` for this class, compiling it on
+        first use. The table is stored per class and rebuilt whenever
+        ``ctn_accept_binding`` is replaced, e.g. by a subclass (modifying
+        the dictionary in place is not detected).
+        """
+        table = cls.__dict__.get('_ctn_table')
+        if table is None or table.binding is not cls.ctn_accept_binding:
+            table = NegotiationTable(cls, cls.ctn_accept_binding,
+                                     cls.ctn_cache_size)
+            cls._ctn_table = table
+        return table
 
-        if self._ctn_provides_priorities is not None:
-            return self._ctn_provides_priorities
-        providing = []
-        for x in self.ctn_accept_binding.items():
-            if isinstance(x[1], list) or isinstance(x[1], tuple):
-                providing.append(x)
-            else:
-                providing.append((x[0], (1, x[1])))
-        providing.sort(provides_priority_sorting)
-        providing.reverse()
-        self._ctn_provides_priorities = providing
-        return providing
+    @classmethod
+    def _ctn_cache_info(cls):
+        """
+        Return the hits, misses and size of the negotiation cache as a
+        dict, or None if caching is disabled.
+        """
+        cache = cls._ctn_get_table().cache
+        if cache is not None:
+            return cache.info()
 
+    def _ctn_data(self, request, *args, **kwargs):
+        """
+        Return the data for the renderers to encode.
+        """
+        raise RuntimeError("You have to override AbstractCTNView's _ctn_data "
+                           "method to bind media types to renderers")
+
+    def _ctn_data_key(self, request, *args, **kwargs):
+        """
+        Return a string identifying the data ``_ctn_data`` would return for
+        the given arguments, for caching the rendered output, or None if
+        it must not be cached.
+        """
+        return request_key(None, (), (request,) + args, kwargs)
+
+    def _ctn_build_provides_priorities(self):
+        return self._ctn_get_table().providing
 
     def _ctn_build_request_priorities(self, request):
         """
@@ -122,28 +495,9 @@ class AbstractCTNView(BaseView):
             return self._ctn_request_priorities
 
         accept = request.META.get('HTTP_ACCEPT', "*/*")
-        # Accept is basically a list separated by "," with options coming
-        # before the actual type and being separated by a ";" from it.
-        # For now, all this handles is the q-parameter which handles the
-        # priority of the type. If not set, this is set to 1
-        types = []
-        for accepted_type in accept.split(","):
-            tinfo = accepted_type.split(";")
-            type_ = tinfo[0].lstrip().rstrip()
-            if len(tinfo) == 1:
-                q = 1
-            else:
-                parameters = [x.lstrip().rstrip() for x in tinfo[1].split(";")]
-                q = 1
-                for p in parameters:
-                    if p.startswith("q="):
-                        q = float(p.split("=")[1])
-                        break
-                if q < 0 or q > 1:
-                    continue
-            types.append((type_, q))
+        types = parse_qvalues(accept)
         if len(types) > 0:
-            types.sort(accept_priority_sorting)
+            types.sort(key=cmp_to_key(accept_priority_sorting))
             types.reverse()
         else:
             types.append(('*/*', 1))
@@ -154,23 +508,59 @@ class AbstractCTNView(BaseView):
         """
         Main dispatcher for request.
         """
-        self._ctn_build_request_priorities(request)
-        self._ctn_build_provides_priorities()
-        for (type_, priority) in self._ctn_request_priorities:
-            (tfamily, tspec) = type_.split('/')
-            # If the requested type is a type-wildcard, we have to go through
-            # the local priority list, otherwise a normal lookup is enough.
-            if tspec is '*':
-                for binding in self._ctn_provides_priorities:
-                    if binding[0].startswith(tfamily+'/'):
-                        return getattr(self, binding[1][1])(request, *args, **kwargs)
-            else:
-                for t in (type_, '%s/*'%(tfamily,)):
-                    if t in self.ctn_accept_binding.keys():
-                        if isinstance(self.ctn_accept_binding[t], tuple):
-                            name = self.ctn_accept_binding[t][1]
-                        else:
-                            name = self.ctn_accept_binding[t]
-                        return getattr(self, name)(request, *args, **kwargs)
-        return HttpResponseNotAcceptable()
+        table = self._ctn_get_table()
+        if table.cache is None:
+            handler = table.lookup(self._ctn_build_request_priorities(request))
+        else:
+            accept = request.META.get('HTTP_ACCEPT', "*/*")
+            handler = table.cache.get(accept, _missing)
+            if handler is _missing:
+                handler = table.lookup(
+                    self._ctn_build_request_priorities(request))
+                table.cache.set(accept, handler)
+        if handler is None:
+            return HttpResponseNotAcceptable()
+        vary = ('Accept',)
+        if self.ctn_languages:
+            # the view instance is shared by concurrent requests
+            request.ctn_language = negotiate_language(
+                request.META.get('HTTP_ACCEPT_LANGUAGE'), self.ctn_languages)
+            vary += ('Accept-Language',)
+        response = handler(self, request, *args, **kwargs)
+        if not hasattr(response, 'has_header'):
+            return response
+        if self.ctn_encodings:
+            self._ctn_compress(request, response, table)
+            vary += ('Accept-Encoding',)
+        patch_vary_headers(response, vary)
+        return response
 
+    def _ctn_compress(self, request, response, table):
+        """
+        Compress the content of ``response`` in place, if possible.
+        """
+        if response.status_code != 200 or \
+                response.has_header('Content-Encoding') or \
+                getattr(response, 'streaming', False) or \
+                getattr(response, '_base_content_is_iter', False):
+            return
+        encoding = negotiate_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING'), self.ctn_encodings)
+        if encoding is None:
+            return
+        content = response.content
+        if len(content) < self.ctn_compress_min_size:
+            return
+        # hashing is much cheaper than compressing
+        key = (encoding, len(content), hashlib.md5(content).digest())
+        compressed = table.variants.get(key)
+        if compressed is None:
+            compressed = compress(content, encoding, self.ctn_compress_level)
+            table.variants.set(key, compressed)
+        response.content = compressed
+        response['Content-Encoding'] = encoding
+        response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/'):
+            # the content differs from the identity variant now
+            response['ETag'] = 'W/' + etag
@@ -0,0 +1,80 @@
+"""
+Dispatching calls of a view to a method per HTTP method.
+
+Instead of checking ``request.method`` in ``__call__``, a view (or nested
+view) can leave ``__call__`` alone and define methods named after the HTTP
+methods it supports:
+
+    class CommentView(View):
+        def __before__(self, args, kwargs):
+            self.comment = get_object_or_404(Comment, id=kwargs['id'])
+
+        def get(self, request, id):
+            # ...
+
+        def post(self, request, id):
+            # ...
+
+Calling the proxy then runs the method matching the request, wrapped in
+``__before__`` and ``__after__`` as usual. The dispatch table is built
+once, when the proxy is created. Requests for other methods get a 405
+response, and OPTIONS requests one with an ``Allow`` header, both without
+running any of the view's hooks. HEAD requests run ``head``, if defined,
+or ``get`` otherwise, and get the same response as a GET request would;
+servers leave out its body.
+"""
+
+from django.http import HttpResponse, HttpResponseNotAllowed
+
+from .base import HTTP_METHODS, iscoroutinefunction
+
+
+__all__ = ('MethodDispatch',)
+
+
+class MethodDispatch(object):
+    """The names of the view's methods that handle each HTTP method."""
+
+    def __init__(self, view):
+        handlers = {}
+        for name in HTTP_METHODS:
+            if callable(getattr(view, name, None)):
+                handlers[name.upper()] = name
+        if 'GET' in handlers:
+            handlers.setdefault('HEAD', handlers['GET'])
+        self.handlers = handlers
+        self.allowed = sorted(set(handlers) | set(['OPTIONS']))
+
+    def compile(self, spec):
+        """Return the function to call for the proxy's ``__call__``, given
+        the ``_ProxySpec`` that compiles the invokers of the view's
+        methods.
+        """
+        compiled = {}
+        invokers = {}
+        for method, name in self.handlers.items():
+            if name not in compiled:
+                compiled[name] = spec.compile(name, spec.lookup(name))
+            invokers[method] = compiled[name]
+        allowed = self.allowed
+        allow = ', '.join(allowed)
+
+        if any(iscoroutinefunction(invoke) for invoke in invokers.values()):
+            from django_oopviews._async import make_method_dispatcher
+            return make_method_dispatcher(invokers, allowed)
+
+        def dispatch(request, *args, **kwargs):
+            invoke = invokers.get(request.method)
+            if invoke is None:
+                return method_not_handled(request, allowed, allow)
+            return invoke(request, *args, **kwargs)
+        return dispatch
+
+
+def method_not_handled(request, allowed, allow):
+    if request.method == 'OPTIONS':
+        response = HttpResponse()
+        response['Allow'] = allow
+        response['Content-Length'] = '0'
+        return response
+    return HttpResponseNotAllowed(allowed)
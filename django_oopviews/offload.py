@@ -0,0 +1,176 @@
+"""
+Running CPU-bound view methods in other processes.
+
+A method that spends its time computing in Python, e.g. generating a large
+report, holds the GIL and slows down all other threads of the server
+process. Marked with ``cpu_bound``, it is run in a pool of worker
+processes instead, while the view's ``__before__`` and ``__after__`` hooks
+still run in the process handling the request:
+
+    class ReportView(View):
+        def __before__(self, args, kwargs):
+            self.user_id = args[0].user.id
+
+        @cpu_bound
+        def yearly(self, request, year):
+            # request is None here
+            return build_report(self.user_id, year)
+
+        def __after__(self, response):
+            return HttpResponse(response, mimetype='text/csv')
+
+The method is called on a copy of the view, with copies of its arguments,
+all of which are pickled to send them to the worker process; so is the
+result to send it back. Request objects cannot be pickled, so the method
+gets None instead of the request, wherever it is among its arguments or
+the attributes of the view (like ``SimpleView.request``); whatever it
+needs from it has to be stored on the view by ``__before__``. If the
+view, the arguments or the result cannot be pickled after all, or the
+worker cannot unpickle them, the method is run in the request's process
+as usual.
+
+By default, methods run in ``default_pool``, which uses as many processes
+as there are CPUs. Create another ``ProcessPool`` and pass it to
+``cpu_bound`` to use a pool of a different size.
+"""
+
+import functools
+import multiprocessing
+import os
+import pickle
+import threading
+
+from .base import _copy_view
+
+
+__all__ = ('ProcessPool', 'cpu_bound', 'default_pool',)
+
+
+class ProcessPool(object):
+    """A lazily started ``multiprocessing.Pool`` of ``processes`` worker
+    processes (by default, one per CPU).
+
+    The pool is started on first use, in each process that uses it, so
+    one created before a server forks its workers is not shared between
+    them. ``offloaded`` and ``fallbacks`` count the calls that were run in
+    the pool and those that could not be.
+    """
+
+    def __init__(self, processes=None):
+        self.processes = processes
+        self.offloaded = self.fallbacks = 0
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get_pool(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._pool = multiprocessing.Pool(self.processes)
+                    self._pid = pid
+        return self._pool
+
+    def close(self):
+        """Stop the worker processes; they are started again when
+        needed.
+        """
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.close()
+                self._pool.join()
+            self._pool = self._pid = None
+
+    def run(self, func, view, name, args, kwargs):
+        """Call the method ``name`` of ``view`` in the pool, with the
+        given arguments; if that is not possible, call ``func`` in this
+        process instead.
+        """
+        try:
+            payload = pickle.dumps(_without_requests(view, name, args, kwargs),
+                                   pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            payload = None
+        if payload is not None:
+            result = self.get_pool().apply(_run_pickled, (payload,))
+            if result is not None:
+                with self._lock:
+                    self.offloaded += 1
+                return pickle.loads(result)
+        with self._lock:
+            self.fallbacks += 1
+        return func(*args, **kwargs)
+
+    def wrap(self, func, name, view=None):
+        """Return a function that runs the view method ``func`` in the
+        pool. See ``base._compile_invoker`` regarding ``view``; if it is
+        not given, ``func`` is a bound method.
+        """
+        run = self.run
+        if view is not None:
+            def invoke(view, *args, **kwargs):
+                return run(functools.partial(func, view), view, name, args,
+                           kwargs)
+        else:
+            view = func.__self__
+            def invoke(*args, **kwargs):
+                return run(func, view, name, args, kwargs)
+        return invoke
+
+
+def _is_request(value):
+    return hasattr(value, 'META')
+
+
+def _without_requests(view, name, args, kwargs):
+    """Return what is sent to the worker process, with None in place of
+    any request.
+    """
+    attrs = getattr(view, '__dict__', {})
+    requests = [key for key, value in attrs.items() if _is_request(value)]
+    if requests:
+        view = _copy_view(view)
+        for key in requests:
+            setattr(view, key, None)
+    args = tuple([None if _is_request(arg) else arg for arg in args])
+    kwargs = dict([(key, None if _is_request(value) else value)
+                   for key, value in kwargs.items()])
+    return view, name, args, kwargs
+
+
+def _run_pickled(payload):
+    """Run the pickled call in a worker process; return the pickled
+    result, or None if either cannot be pickled, so that the call is run
+    in the request's process instead.
+    """
+    try:
+        view, name, args, kwargs = pickle.loads(payload)
+    except Exception:
+        return None
+    result = getattr(view, name)(*args, **kwargs)
+    try:
+        return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+
+default_pool = ProcessPool()
+
+
+def cpu_bound(func=None, pool=None):
+    """Decorator to run a view method in a pool of worker processes,
+    ``default_pool`` unless another ``ProcessPool`` is given:
+
+        @cpu_bound
+        def report(self, request): ...
+
+        @cpu_bound(pool=ProcessPool(2))
+        def report(self, request): ...
+    """
+    def decorator(func):
+        func.process_pool = pool or default_pool
+        return func
+    if func is not None:
+        return decorator(func)
+    return decorator
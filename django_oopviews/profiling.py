@@ -0,0 +1,198 @@
+"""
+Sampling profiles of view calls with ``cProfile``.
+
+Profiling is made possible per view class by setting its ``profiling``
+attribute to ``True`` (to use the default ``registry``) or to a
+``ProfileRegistry``; like ``timings``, this is inherited, and has to be
+done before the proxies are created. It does not start any profiling
+yet: that is switched on at runtime, for a fraction of the calls of a
+single view, or just one of its methods, e.g. from a management command or
+a debugging view:
+
+    from django_oopviews import View
+    View.profiling = True
+
+    # later, while the server is running
+    from django_oopviews.profiling import registry
+    registry.enable(BookView, rate=0.05)        # profile 5% of the calls
+    ...
+    registry.disable(BookView)
+    registry.dump('/tmp/profiles')
+
+The profiles of all sampled calls of a view are added up, and ``dump``
+writes them to one file per view, which can be loaded with ``pstats``::
+
+    python -m pstats /tmp/profiles/books.views.BookView.prof
+
+As long as profiling is not enabled for a view, calling it only costs an
+additional attribute lookup. Only one call in the process is profiled at
+a time, as Python 3.12+ does not allow more than one active profiler;
+sampled calls arriving meanwhile, and those made while any other profiler
+is active, run unprofiled. From Python 3.12, a profiler sees the calls of
+all threads, so a sample also contains whatever other requests ran at the
+same time; with a threaded server, look for the view's own functions, or
+sample a single-threaded worker. Coroutine views are not profiled, as the
+profile would end at their first ``await``; enabling profiling for them
+has no effect.
+"""
+
+import cProfile
+import os
+import pstats
+import random
+import threading
+
+from django_oopviews import timing
+from django_oopviews.base import iscoroutinefunction
+
+
+__all__ = ('ProfileRegistry', 'registry',)
+
+
+class Sampler(object):
+    """The share of the calls of one method of a view to profile."""
+
+    __slots__ = ('rate',)
+
+    def __init__(self, rate=0):
+        self.rate = rate
+
+
+class ProfileRegistry(object):
+    """Decides which view calls to profile, and collects their profiles,
+    added up per view.
+    """
+
+    def __init__(self):
+        self.profiles = {}
+        self.samples = {}
+        self._samplers = {}
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    def sampler(self, view, method):
+        """Return the ``Sampler`` for ``method`` of ``view`` (a name)."""
+        with self._lock:
+            sampler = self._samplers.get((view, method))
+            if sampler is None:
+                sampler = self._samplers[view, method] = Sampler(
+                    self._rates.get((view, method),
+                                    self._rates.get((view, None), 0)))
+            return sampler
+
+    def enable(self, view, rate=1.0, method=None):
+        """Profile the given share of the calls of ``view`` (a class or
+        its name), or only those of its ``method``.
+        """
+        view = view_name(view)
+        with self._lock:
+            self._rates[view, method] = rate
+            for (sampled_view, sampled_method), sampler in \
+                    self._samplers.items():
+                if sampled_view != view:
+                    continue
+                if method is None:
+                    sampler.rate = self._rates.get(
+                        (view, sampled_method), rate)
+                elif sampled_method == method:
+                    sampler.rate = rate
+
+    def disable(self, view=None, method=None):
+        """Stop profiling ``view``, or one of its methods; by default,
+        stop profiling altogether.
+        """
+        if view is None:
+            with self._lock:
+                self._rates.clear()
+                for sampler in self._samplers.values():
+                    sampler.rate = 0
+            return
+        if method is None:
+            view = view_name(view)
+            with self._lock:
+                for key in list(self._rates):
+                    if key[0] == view:
+                        del self._rates[key]
+                for (sampled_view, _), sampler in self._samplers.items():
+                    if sampled_view == view:
+                        sampler.rate = 0
+        else:
+            self.enable(view, 0, method)
+
+    def wrap_invoker(self, invoke, view, name):
+        if iscoroutinefunction(invoke):
+            return invoke
+        view = view_name(view.__class__)
+        sampler = self.sampler(view, name)
+        add = self.add
+        sample = random.random
+
+        def invoke_sampled(*args, **kwargs):
+            rate = sampler.rate
+            if not rate or sample() >= rate or not _active.acquire(False):
+                return invoke(*args, **kwargs)
+            try:
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except Exception:
+                    # another profiler is active (Python 3.12+)
+                    return invoke(*args, **kwargs)
+                try:
+                    return invoke(*args, **kwargs)
+                finally:
+                    profile.disable()
+                    try:
+                        add(view, profile)
+                    except Exception:
+                        # never let profiling break a request
+                        pass
+            finally:
+                _active.release()
+        return invoke_sampled
+
+    def add(self, view, profile):
+        """Add a ``cProfile.Profile`` to those of ``view`` (a name)."""
+        with self._lock:
+            stats = self.profiles.get(view)
+            if stats is None:
+                self.profiles[view] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+            self.samples[view] = self.samples.get(view, 0) + 1
+
+    def stats(self, view):
+        """Return the ``pstats.Stats`` of ``view`` (a class or its name),
+        or None if no call has been profiled yet.
+        """
+        return self.profiles.get(view_name(view))
+
+    def dump(self, directory):
+        """Write the profile of each view to ``<view name>.prof`` in
+        ``directory``, and return the paths of the files.
+        """
+        paths = []
+        with self._lock:
+            for view, stats in sorted(self.profiles.items()):
+                path = os.path.join(directory, '%s.prof' % view)
+                stats.dump_stats(path)
+                paths.append(path)
+        return paths
+
+    def clear(self):
+        with self._lock:
+            self.profiles.clear()
+            self.samples.clear()
+
+
+registry = ProfileRegistry()
+
+
+# held while a call is profiled, by any registry
+_active = threading.Lock()
+
+
+def view_name(view):
+    if isinstance(view, str):
+        return view
+    return timing.view_name(view)
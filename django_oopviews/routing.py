@@ -0,0 +1,177 @@
+"""
+Mapping the URLs below a prefix to the methods and nested views of a proxy.
+
+Instead of writing a URL pattern for each method of a view, mount its
+proxy at a prefix:
+
+    from django_oopviews.routing import Router
+
+    book = create_view(BookView)
+    urlpatterns = patterns('',
+        url(r'^books/', include(Router(book).urls)),
+    )
+
+Each segment of the path below the prefix then selects a public method or
+nested view by name, starting from the proxy, and the remaining segments
+are passed as positional arguments: ``/books/by_author/10/`` calls
+``book.by_author(request, '10')``, and ``/books/10/`` calls
+``book(request, '10')``, unless the view has a method or nested view named
+``10``. Paths that do not match a method, or do not have the number of
+arguments it accepts, raise ``Http404``. For a ``SimpleView``, these are
+its shared ``args``, optionally followed by its ``kwargs``.
+
+The table of routes is built once, when the router is created: a dict per
+proxy, so that each segment is resolved with a single lookup, together
+with how many arguments each method accepts. Resolved paths are cached in
+an ``LRUCache`` of ``cache_size`` entries.
+"""
+
+import inspect
+
+from django.conf.urls import url
+from django.http import Http404
+
+from .base import HTTP_METHODS, BaseView, InvocationProxyBase
+from .cache import LRUCache
+from .simple import SimpleView
+
+
+__all__ = ('Router',)
+
+
+class Route(object):
+    """What a path resolves to: the function to ``invoke``, the range of
+    positional arguments it accepts (``max_args`` is None if there is no
+    limit) and the routes below it, by segment.
+    """
+
+    __slots__ = ('invoke', 'min_args', 'max_args', 'children')
+
+    def __init__(self, invoke, min_args=0, max_args=None, children=None):
+        self.invoke = invoke
+        self.min_args = min_args
+        self.max_args = max_args
+        self.children = children or {}
+
+    def accepts(self, count):
+        return self.invoke is not None and count >= self.min_args and \
+            (self.max_args is None or count <= self.max_args)
+
+
+class Router(object):
+    """Resolves paths to the methods and nested views of ``proxy``, and
+    can be used as the Django view handling them, with the path passed as
+    ``path`` keyword argument.
+    """
+
+    def __init__(self, proxy, prefix='', cache_size=1024):
+        self.proxy = proxy
+        self.prefix = prefix
+        self.root = _build_route(proxy)
+        self.cache = LRUCache(cache_size)
+
+    @property
+    def urls(self):
+        """The URL patterns sending everything below ``prefix`` to the
+        router; use with ``include``, or add to ``urlpatterns``.
+        """
+        return [url(r'^%s(?P<path>.*)$' % self.prefix, self)]
+
+    def resolve(self, path):
+        """Return the function to call for ``path``, together with the
+        positional arguments taken from it, or None if nothing matches.
+        """
+        resolved = self.cache.get(path, _missing)
+        if resolved is _missing:
+            resolved = self._resolve(path)
+            self.cache.set(path, resolved)
+        return resolved
+
+    def _resolve(self, path):
+        segments = path.strip('/')
+        segments = segments.split('/') if segments else []
+        route = self.root
+        for i, segment in enumerate(segments):
+            child = route.children.get(segment)
+            if child is None:
+                args = tuple(segments[i:])
+                break
+            route = child
+        else:
+            args = ()
+        if not route.accepts(len(args)):
+            return None
+        return route.invoke, args
+
+    def __call__(self, request, path='', *args, **kwargs):
+        resolved = self.resolve(path)
+        if resolved is None:
+            raise Http404(path)
+        invoke, path_args = resolved
+        return invoke(request, *(path_args + args), **kwargs)
+
+
+_missing = object()
+
+
+def _build_route(proxy):
+    spec = proxy._spec
+    invoke = proxy
+    min_args, max_args = _call_arguments(spec)
+    if min_args is None:
+        # e.g. a view that only holds nested views
+        invoke = None
+    children = {}
+    for name in spec.names():
+        if name == '__call__':
+            continue
+        if spec.methods is not None and name in HTTP_METHODS:
+            continue
+        attr = getattr(proxy, name)
+        if isinstance(attr, InvocationProxyBase):
+            children[name] = _build_route(attr)
+        else:
+            children[name] = Route(attr,
+                                   *_arguments(spec.lookup(name), spec.view))
+    return Route(invoke, min_args, max_args, children)
+
+
+def _call_arguments(spec):
+    """Return the range of arguments the proxy of ``spec`` accepts when
+    called, or ``(None, None)`` if it cannot be called at all.
+    """
+    if spec.methods is not None:
+        ranges = [_arguments(getattr(spec.view, name), spec.view)
+                  for name in set(spec.methods.handlers.values())]
+        maxes = [max_args for min_args, max_args in ranges]
+        return (min(min_args for min_args, max_args in ranges),
+                None if None in maxes else max(maxes))
+    call = type(spec.view).__call__
+    if getattr(call, '__func__', call) is BaseView.__dict__['__call__']:
+        return None, None
+    return _arguments(spec.view.__call__, spec.view)
+
+
+def _arguments(func, view):
+    """Return the least and the most number of positional arguments the
+    method ``func`` of ``view`` accepts after the request; the latter is
+    None if there is no limit, or if it cannot be told.
+    """
+    if isinstance(view, SimpleView):
+        # the methods themselves take no arguments; the shared ones are
+        # bound by ``__before__``
+        return len(view.args), len(view.args) + len(view.kwargs)
+    getargspec = getattr(inspect, 'getfullargspec', None) or \
+        inspect.getargspec
+    try:
+        spec = getargspec(func)
+    except TypeError:
+        return 0, None
+    names = spec.args
+    if inspect.ismethod(func):
+        names = names[1:]
+    names = names[1:]
+    min_args = max(len(names) - len(spec.defaults or ()), 0)
+    if spec.varargs:
+        return min_args, None
+    return min_args, len(names)
@@ -1,9 +1,69 @@
+import hashlib
+
 from django.shortcuts import render_to_response
-from django.template import RequestContext
-from base import View, create_view
+from django.template import RequestContext, loader
+from .base import View, create_view
+from .cache import LocalCache
+from .streaming import StreamingHttpResponse, stream_template, force_text
+
+
+__all__ = ('SimpleView', 'create_view', 'streamed',)
 
 
-__all__ = ('SimpleView', 'create_view',)
+class streamed(object):
+    """Wrap the template name of a ``(template_name, context)`` tuple
+    returned by a ``SimpleView`` to have the template streamed, as if
+    ``stream_templates`` was set on the view.
+    """
+
+    def __init__(self, template_name):
+        self.template_name = template_name
+
+
+class ArgumentBinding(object):
+    """The shared ``args`` and ``kwargs`` of a ``SimpleView``, compiled
+    once so that ``__before__`` does not need to work them out again for
+    every request.
+    """
+
+    def __init__(self, args, kwargs):
+        self.positional = ('request',) + tuple(args)
+        self.keywords = tuple(kwargs.items())
+        self.defaults = dict(kwargs)
+
+    def bind(self, args, kwargs):
+        """Remove the shared parameters from the ``args`` list and the
+        ``kwargs`` dict a view was called with, and return their values
+        as a dict.
+        """
+        positional = self.positional
+        values = dict(zip(positional, args))
+        if len(args) >= len(positional):
+            del args[:len(positional)]
+        else:
+            # positional args may be passed as keywords, but only allow
+            # that if all required positional arguments are filled, i.e.
+            # it is not possible to pass a positional argument out of
+            # order (the "got multiple values for keyword argument" error
+            # in normal Python).
+            missing = positional[len(args):]
+            del args[:]
+            for name in missing:
+                try:
+                    values[name] = kwargs.pop(name)
+                except KeyError:
+                    raise TypeError("missing shared argument '%s'" % name)
+
+        if args:
+            # allow passing keywords as positional args
+            for name, default in self.keywords:
+                values[name] = kwargs.pop(name, args.pop() if args else default)
+        elif kwargs:
+            for name, default in self.keywords:
+                values[name] = kwargs.pop(name, default)
+        else:
+            values.update(self.defaults)
+        return values
 
 
 class SimpleView(View):
@@ -51,46 +111,142 @@ class SimpleView(View):
     The context returned by ``__call__`` will be merged with the base
     context returned by ``_init_context``, and used to render the
     template.
+
+    If building the base context is expensive, it can be cached for a
+    number of seconds by setting ``context_cache_timeout``:
+
+        class BookView(SimpleView):
+            args = ['id']
+            context_cache_timeout = 60
+
+            def _init_context():
+                return {'book': get_object_or_404(Book, pk=self.id)}
+
+    The context is cached separately for every combination of the
+    shared ``args`` and ``kwargs`` values, so all subviews of
+    ``book(request, 10)`` share the same entry. Note that on a cache hit
+    ``_init_context`` is not called, so it must not be used to set
+    attributes that the views rely on. The cache is a ``LocalCache`` per
+    class, keeping up to ``context_cache_size`` entries, unless a backend
+    (e.g. one of Django's caches) is given as ``context_cache``. Use
+    ``_invalidate_context`` to drop an entry early:
+
+        BookView._invalidate_context(10)
+
+    Large pages can be sent while the template is still being rendered,
+    rather than building the whole response in memory first, by setting
+    ``stream_templates`` on the view class, or for a single response by
+    returning ``streamed('template.html'), context``. See
+    ``streaming.stream_template`` for how the output is split.
     """
 
     args = []
     kwargs = {}
 
-    def __before__(self, args, kwargs):
-        shared_args = ['request'] + getattr(self, 'args', [])
-        shared_kwargs = getattr(self, 'kwargs', {})
+    context_cache_timeout = 0
+    context_cache_size = 1000
+    context_cache = None
 
-        for name in shared_args:
-            # positional args may be passed as keywords, but only allow
-            # that if all required positional arguments are filled, i.e.
-            # it is not possible to pass a positional argument out of
-            # order (the "got multiple values for keyword argument" error
-            # in normal Python).
-            if not args and name in kwargs:
-                setattr(self, name, kwargs.pop(name))
-            else:
-                setattr(self, name, args.pop(0))
-        for name, default in shared_kwargs.items():
-            setattr(self, name,
-                # allow passing keywords as positional args
-                kwargs.pop(name, args.pop() if args else default))
-
-        prepared = self._init_context()
+    stream_templates = False
+
+    def __setup__(self):
+        self._binding = ArgumentBinding(self.args, self.kwargs)
+        if self.context_cache_timeout:
+            self._get_context_cache()
+
+    def __before__(self, args, kwargs):
+        binding = self.__dict__.get('_binding')
+        if binding is None:
+            # not set up through ``create_view``
+            self.__setup__()
+            binding = self._binding
+        values = binding.bind(args, kwargs)
+        self.__dict__.update(values)
+
+        if self.context_cache_timeout:
+            prepared = self._cached_init_context(values)
+        else:
+            prepared = self._init_context()
         if isinstance(prepared, dict):
             self._base_context = prepared
         else:
             return prepared  # can be used to return a result from here
 
     def __after__(self, response):
-        if not isinstance(response, tuple):
+        if not isinstance(response, tuple) or len(response) != 2:
             return response
         template_name, context = response
         self._base_context.update(context)
+        stream = self.stream_templates
+        if isinstance(template_name, streamed):
+            template_name, stream = template_name.template_name, True
+        if stream:
+            return self._render_streaming(template_name, self._base_context)
         return self._render(template_name, self._base_context)
 
     def _init_context(self):
         return {}
 
+    def _cached_init_context(self, values):
+        cache = self._get_context_cache()
+        key = self._context_cache_key(values)
+        context = cache.get(key)
+        if context is None:
+            context = self._init_context()
+            if not isinstance(context, dict):
+                return context
+            cache.set(key, context, self.context_cache_timeout)
+        # views may add to the base context
+        return dict(context)
+
+    @classmethod
+    def _get_context_cache(cls):
+        if cls.context_cache is not None:
+            return cls.context_cache
+        cache = cls.__dict__.get('_local_context_cache')
+        if cache is None:
+            cache = cls._local_context_cache = \
+                LocalCache(cls.context_cache_size, cls.context_cache_timeout)
+        return cache
+
+    @classmethod
+    def _context_cache_key(cls, values):
+        """Return the key the base context for the given shared parameter
+        values (a dict) is cached under.
+        """
+        digest = hashlib.md5()
+        for name in list(cls.args) + sorted(cls.kwargs):
+            value = force_text(values[name]).encode('utf-8')
+            # prefix the length, so that no two sets of values are joined
+            # to the same string
+            digest.update(('%d:' % len(value)).encode('ascii') + value)
+        # keep keys short and safe for e.g. memcached
+        return 'oopviews:%s.%s:%s' % (cls.__module__, cls.__name__,
+                                      digest.hexdigest())
+
+    @classmethod
+    def _invalidate_context(cls, *args, **kwargs):
+        """Remove the cached base context for the given shared parameters,
+        which are passed the same way as to the view itself, but without
+        the request.
+        """
+        values = dict(cls.kwargs)
+        values.update(zip(cls.args, args))
+        values.update(kwargs)
+        cls._get_context_cache().delete(cls._context_cache_key(values))
+
     def _render(self, template_name, context):
         return render_to_response(template_name, context,
-            context_instance=RequestContext(self.request))
\ No newline at end of file
+            context_instance=RequestContext(self.request))
+
+    def _render_streaming(self, template_name, context):
+        if hasattr(template_name, 'render'):
+            template = template_name   # already a Template object
+        elif isinstance(template_name, (list, tuple)):
+            template = loader.select_template(template_name)
+        else:
+            template = loader.get_template(template_name)
+        context_instance = RequestContext(self.request)
+        context_instance.update(context)
+        return StreamingHttpResponse(
+            stream_template(template, context_instance))
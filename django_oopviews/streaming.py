@@ -0,0 +1,190 @@
+"""
+Helpers for sending responses incrementally, rather than building the
+whole body in memory first.
+"""
+
+from contextlib import contextmanager
+from types import GeneratorType
+
+from django.http import HttpResponse
+from django.template.base import Node, TextNode
+
+try:
+    from django.template.loader_tags import BlockContext, BlockNode, \
+        ExtendsNode, BLOCK_CONTEXT_KEY
+except ImportError:
+    ExtendsNode = None
+
+try:
+    from django.http import StreamingHttpResponse
+except ImportError:
+    # Before Django 1.5, a response created with an iterator is streamed
+    StreamingHttpResponse = HttpResponse
+
+try:
+    from django.utils.encoding import force_text
+except ImportError:
+    from django.utils.encoding import force_unicode as force_text
+
+
+__all__ = ('StreamingHttpResponse', 'stream_template', 'map_chunks',)
+
+
+def wrap_iterators(func):
+    """Return a function that calls ``func``, and returns the result in a
+    streaming response if it is an iterator, e.g. from a generator.
+
+    Used by the proxies for view methods that are generator functions,
+    or all methods of views with ``stream_iterators`` set, so that
+    ``__after__`` gets a response it can e.g. add headers to, or whose
+    chunks it can transform with ``map_chunks``.
+    """
+    def invoke(*args, **kwargs):
+        response = func(*args, **kwargs)
+        if is_iterator(response):
+            return StreamingHttpResponse(response)
+        return response
+    return invoke
+
+
+def is_iterator(value):
+    if isinstance(value, GeneratorType):
+        return True
+    # responses are iterators before Django 1.5
+    if isinstance(value, (HttpResponse, StreamingHttpResponse)):
+        return False
+    return hasattr(value, '__next__') or hasattr(value, 'next')
+
+
+def map_chunks(response, func):
+    """Have ``func`` applied to each chunk of the streaming ``response``
+    as it is sent, and return the response.
+    """
+    if hasattr(response, 'streaming_content'):
+        chunks = response.streaming_content
+        response.streaming_content = (func(chunk) for chunk in chunks)
+    else:
+        # Django 1.4 keeps the iterator as it is given
+        chunks = response._container
+        response._container = (func(chunk) for chunk in chunks)
+    return response
+
+
+def stream_template(template, context):
+    """Render ``template`` with ``context`` the same way
+    ``template.render(context)`` would, but yield the output in chunks
+    as it is rendered.
+
+    Template inheritance and blocks are followed, so that the output
+    is split at every tag outside of ``{% block %}`` tags and at every
+    top-level tag inside of them; other tags are each rendered as a
+    whole. In particular, a ``{% for %}`` loop is one chunk, however many
+    items it loops over: to stream a large listing, have the view method
+    return a generator yielding its rows instead. This mirrors how Django renders ``{% extends %}`` and
+    ``{% block %}``; if the version of Django in use does not work the
+    same way, the template is rendered in a single chunk instead.
+    """
+    # the template of a template backend (Django 1.8+)
+    template = getattr(template, 'template', template)
+    if not _can_stream:
+        yield force_text(template.render(context))
+        return
+    with _render_state(template, context):
+        if getattr(context, 'template', False) is None:
+            # Django 1.8+; e.g. runs the processors of a RequestContext
+            with context.bind_template(template):
+                for chunk in _stream_nodelist(template.nodelist, context):
+                    yield chunk
+        else:
+            for chunk in _stream_nodelist(template.nodelist, context):
+                yield chunk
+
+
+_can_stream = ExtendsNode is not None and \
+    hasattr(ExtendsNode, 'get_parent') and \
+    hasattr(BlockContext, 'add_blocks') and hasattr(BlockContext, 'push')
+
+
+@contextmanager
+def _render_state(template, context, isolated_context=True):
+    render_context = context.render_context
+    if hasattr(render_context, 'push_state'):
+        # Django 2.0+
+        with render_context.push_state(template, isolated_context):
+            yield
+    elif isolated_context:
+        render_context.push()
+        try:
+            yield
+        finally:
+            render_context.pop()
+    else:
+        yield
+
+
+def _render_node(node, nodelist, context):
+    if hasattr(node, 'render_annotated'):
+        # Django 1.9+
+        return node.render_annotated(context)
+    if hasattr(nodelist, 'render_node'):
+        return nodelist.render_node(node, context)
+    return node.render(context)
+
+
+def _stream_nodelist(nodelist, context):
+    for node in nodelist:
+        if isinstance(node, ExtendsNode):
+            chunks = _stream_extends(node, context)
+        elif isinstance(node, BlockNode):
+            chunks = _stream_block(node, context)
+        elif isinstance(node, Node):
+            chunks = (_render_node(node, nodelist, context),)
+        else:
+            chunks = (node,)
+        for chunk in chunks:
+            yield force_text(chunk)
+
+
+def _stream_extends(node, context):
+    # Follows ``ExtendsNode.render``.
+    compiled_parent = node.get_parent(context)
+
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+
+    for parent_node in compiled_parent.nodelist:
+        if not isinstance(parent_node, TextNode):
+            if not isinstance(parent_node, ExtendsNode):
+                block_context.add_blocks(dict([(n.name, n) for n in
+                    compiled_parent.nodelist.get_nodes_by_type(BlockNode)]))
+            break
+
+    with _render_state(compiled_parent, context, isolated_context=False):
+        for chunk in _stream_nodelist(compiled_parent.nodelist, context):
+            yield chunk
+
+
+def _stream_block(node, context):
+    # Follows ``BlockNode.render``.
+    block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+    context.push()
+    try:
+        push = None
+        if block_context is None:
+            block = node
+            context['block'] = block
+        else:
+            push = block = block_context.pop(node.name)
+            if block is None:
+                block = node
+            block = BlockNode(block.name, block.nodelist)
+            block.context = context
+            context['block'] = block
+        for chunk in _stream_nodelist(block.nodelist, context):
+            yield chunk
+        if push is not None:
+            block_context.push(node.name, push)
+    finally:
+        context.pop()
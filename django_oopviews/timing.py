@@ -0,0 +1,196 @@
+"""
+Timing of the individual phases of a view call: the ``__before__`` hook,
+the view itself and the ``__after__`` hook.
+
+Timing is enabled per view class, by setting its ``timings`` attribute
+to ``True`` (to use the default ``registry``) or to a ``TimingRegistry``.
+As this is inherited, it can be enabled for all views at once:
+
+    from django_oopviews import View
+    View.timings = True
+
+It needs to be done before the proxies are created with ``create_view``;
+proxies created without timing do not pay anything for it. The collected
+numbers can then be looked at with ``registry.stats()`` or
+``registry.dump()``, or passed on as they are recorded by adding a sink:
+
+    registry.add_sink(lambda view, method, phases: statsd.timing(...))
+"""
+
+import bisect
+import sys
+import threading
+
+try:
+    from time import perf_counter as clock
+except ImportError:
+    # Python 2 has no monotonic clock in the standard library
+    from time import time as clock
+
+from django_oopviews.base import _copy_view
+
+
+__all__ = ('Histogram', 'TimingRegistry', 'registry',)
+
+
+PHASES = ('before', 'view', 'after')
+
+
+class Histogram(object):
+    """Counts durations (in seconds) in exponentially growing buckets,
+    from one microsecond up to a few minutes.
+    """
+
+    bounds = [1e-6 * 2 ** i for i in range(28)]
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = self.max = None
+
+    def add(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Return an upper bound for the given percentile, i.e. the bound
+        of the bucket it falls into.
+        """
+        if not self.count:
+            return None
+        rank = self.count * percent / 100.0
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {'count': self.count, 'total': self.total,
+                'mean': self.total / self.count,
+                'min': self.min, 'max': self.max,
+                'p50': self.percentile(50), 'p90': self.percentile(90),
+                'p99': self.percentile(99)}
+
+
+class TimingRegistry(object):
+    """Collects the phase timings of views in a ``Histogram`` for each
+    view, method and phase, and passes them on to any sinks.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.sinks = []
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        """Call ``sink(view, method, phases)`` for every view call, with
+        ``phases`` a dict of the duration of each phase that ran.
+        """
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+    def recorder(self, view, method):
+        """Return the function the invoker of ``method`` of ``view`` (a
+        name) uses to report each call.
+        """
+        histograms = {}
+        with self._lock:
+            for phase in PHASES:
+                histograms[phase] = self.histograms.setdefault(
+                    (view, method, phase), Histogram())
+
+        def record(before, view_time, after):
+            phases = {}
+            with self._lock:
+                for phase, value in zip(PHASES, (before, view_time, after)):
+                    if value is not None:
+                        histograms[phase].add(value)
+                        phases[phase] = value
+            for sink in self.sinks:
+                sink(view, method, phases)
+        return record
+
+    def stats(self, view=None):
+        """Return a dict of the summaries of all histograms, keyed by
+        ``(view, method, phase)``; optionally only those of ``view``.
+        """
+        with self._lock:
+            return dict([(key, histogram.summary())
+                         for key, histogram in self.histograms.items()
+                         if histogram.count and view in (None, key[0])])
+
+    def dump(self, stream=None):
+        """Write a table of all timings to ``stream`` (stdout)."""
+        stream = stream or sys.stdout
+        stream.write('%-50s %-7s %8s %10s %10s %10s\n' % (
+            'view', 'phase', 'count', 'mean ms', 'p90 ms', 'max ms'))
+        for (view, method, phase), s in sorted(self.stats().items()):
+            stream.write('%-50s %-7s %8d %10.3f %10.3f %10.3f\n' % (
+                '%s.%s' % (view, method), phase, s['count'],
+                s['mean'] * 1000, s['p90'] * 1000, s['max'] * 1000))
+
+    def clear(self):
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.__init__()
+
+
+registry = TimingRegistry()
+
+
+def compile_timed_invoker(func, before, after, view, record):
+    """Like ``base._compile_invoker``, but measures how long each phase
+    takes and passes the durations to ``record``.
+    """
+    copy_view = _copy_view
+
+    def invoke(*args, **kwargs):
+        scoped = () if view is None else (copy_view(view),)
+        before_time = after_time = None
+        start = clock()
+        if before is not None:
+            args = list(args)
+            response = before(*(scoped + (args, kwargs)))
+            end = clock()
+            before_time, start = end - start, end
+            if response:
+                record(before_time, None, None)
+                return response
+        response = func(*(scoped + tuple(args)), **kwargs)
+        end = clock()
+        view_time = end - start
+        if after is not None:
+            response = after(*(scoped + (response,)))
+            after_time = clock() - end
+        record(before_time, view_time, after_time)
+        return response
+    return invoke
+
+
+def get_recorder(timings, view_class, method):
+    """Return the recorder for ``method`` of ``view_class`` given the
+    value of its ``timings`` attribute.
+    """
+    if timings is True:
+        timings = registry
+    return timings.recorder(view_name(view_class), method)
+
+
+def view_name(view_class):
+    """Return the name views are reported under: the dotted path of
+    ``view_class``.
+    """
+    return '%s.%s' % (view_class.__module__,
+                      getattr(view_class, '__qualname__', view_class.__name__))
@@ -0,0 +1,76 @@
+"""
+Building everything the proxies compute lazily ahead of time.
+
+Servers like gunicorn or uWSGI can load the application once and then
+fork their workers (``--preload`` or ``preload_app``, ``lazy-apps =
+false``). Anything that is computed only after the fork, like wrapping a
+proxy's methods on first access or the negotiation tables of
+``AbstractCTNView``, is computed again in every worker, and takes up
+memory in each of them. Call ``warmup`` at the end of the WSGI module to
+do all of it before forking:
+
+    application = get_wsgi_application()
+
+    from django_oopviews.warmup import warmup
+    warmup(urlconf=settings.ROOT_URLCONF, freeze=True)
+
+As Django only imports the URLconf on the first request, pass its name as
+``urlconf`` to have the proxies it creates built as well; all proxies
+created with ``create_view`` so far are warmed up, including those of
+nested views.
+
+With ``freeze``, all objects alive at that point are then moved into the
+permanent generation of the garbage collector (Python 3.7+), so that
+collections in the workers do not touch them, and their memory pages stay
+shared with the parent process.
+"""
+
+import gc
+
+from django_oopviews.base import _proxy_classes, InvocationProxyBase
+from django_oopviews.timing import clock
+
+
+__all__ = ('warmup',)
+
+
+def warmup(urlconf=None, freeze=False):
+    """Build all proxies created so far, after importing the module named
+    ``urlconf``, if given. Returns a dict reporting what was done: the
+    names of the ``views`` that were warmed up, the number of proxy
+    ``methods`` and nested views that had not been built yet, the
+    ``seconds`` it took and the number of objects ``frozen``.
+    """
+    start = clock()
+    if urlconf is not None:
+        __import__(urlconf)
+
+    seen = set()
+    report = {'views': [], 'methods': 0, 'frozen': 0}
+    # warming up may create the proxies of nested views
+    for proxy_class in list(_proxy_classes):
+        _warmup_proxy(proxy_class(), seen, report)
+
+    if freeze:
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+            report['frozen'] = gc.get_freeze_count()
+    report['seconds'] = clock() - start
+    return report
+
+
+def _warmup_proxy(proxy, seen, report):
+    proxy_class = type(proxy)
+    if proxy_class in seen:
+        return
+    seen.add(proxy_class)
+    view_class = proxy._instance.__class__
+    report['views'].append('%s.%s' % (view_class.__module__,
+                                      view_class.__name__))
+    for name in proxy._spec.names():
+        if name not in proxy_class.__dict__:
+            report['methods'] += 1
+        attr = getattr(proxy, name)
+        if isinstance(attr, InvocationProxyBase):
+            _warmup_proxy(attr, seen, report)
@@ -7,7 +7,7 @@ setup(
         name="django-oopviews",
         author="Horst Gutmann",
         author_email="zerok@zerokspot.com",
-        packages=find_packages(),
+        packages=find_packages(exclude=['benchmarks', 'tests']),
         url="http://github.com/zerok/django-oopviews/",
         version=django_oopviews.get_version(),
         description="django-oopviews provides a simple way to write Django-views in an object-oriented manner.",
@@ -0,0 +1,109 @@
+"""Coroutine based views used by ``test_async``; kept separate, as
+``async def`` is a syntax error on older Pythons.
+"""
+
+import asyncio
+
+from django_oopviews import View
+from django_oopviews.bulkhead import Bulkhead
+from django_oopviews.cache import ResponseCache
+from django_oopviews.coalesce import SingleFlight
+from django_oopviews.composite import CompositeView
+
+
+class AsyncView(View):
+    def __init__(self):
+        self.log = []
+    async def __before__(self, args, kwargs):
+        await asyncio.sleep(0)
+        if args and args[0] == 'short-circuit':
+            return 'before'
+        self.log.append('before')
+    async def __after__(self, response):
+        await asyncio.sleep(0)
+        return response * 2
+    async def __call__(self, n):
+        await asyncio.sleep(0)
+        return n
+    def sync(self, n):
+        return n + 1
+    class sub(View):
+        async def __call__(self, n):
+            await asyncio.sleep(0)
+            return -n
+
+
+class AsyncScopedView(View):
+    request_scoped = True
+    def __before__(self, args, kwargs):
+        self.n = args[0]
+    async def __call__(self, n):
+        await asyncio.sleep(0.001)
+        return self.n
+    @staticmethod
+    async def static(n):
+        return n
+
+
+class MixedView(View):
+    def __after__(self, response):
+        return response, 'after'
+    def __call__(self):
+        return 'sync'
+    async def foo(self):
+        return 'async'
+
+
+async def gather_calls(view, values, return_exceptions=False):
+    """Call ``view`` once for each of ``values``, concurrently."""
+    return await asyncio.gather(*[view(value) for value in values],
+                                return_exceptions=return_exceptions)
+
+
+class CachedAsyncView(View):
+    response_cache = ResponseCache(timeout=60)
+    calls = 0
+    async def __call__(self, request):
+        CachedAsyncView.calls += 1
+        await asyncio.sleep(0.01)
+        return request
+
+
+class CoalescedAsyncView(View):
+    single_flight = SingleFlight()
+    calls = 0
+    async def __call__(self, request):
+        CoalescedAsyncView.calls += 1
+        await asyncio.sleep(0.01)
+        if request == 'error':
+            raise ValueError(request)
+        return [request]
+
+
+class AsyncCompositeView(CompositeView):
+    branches = {'fast': None, 'slow': 0.05, 'sync': None}
+    async def fast(self, request):
+        await asyncio.sleep(0.01)
+        return request
+    async def slow(self, request):
+        await asyncio.sleep(1)
+    def sync(self, request):
+        return 'sync'
+    def _merge(self, request, results, errors):
+        return results, sorted(errors)
+
+
+class LimitedAsyncView(View):
+    concurrency_limit = Bulkhead(max_concurrent=1, max_queue=1,
+                                 queue_timeout=1, reject=lambda n: None)
+    async def __call__(self, n):
+        await asyncio.sleep(0.01)
+        return n
+
+
+class ConditionalAsyncView(View):
+    async def __etag__(self, request):
+        await asyncio.sleep(0)
+        return 'v1'
+    async def __call__(self, request):
+        return 'content'
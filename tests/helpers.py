@@ -0,0 +1,76 @@
+"""Stand-ins for Django's requests and responses, and other helpers
+shared by the tests.
+"""
+
+import threading
+
+from django_oopviews import View
+
+
+class Request(object):
+    """Just enough of ``HttpRequest`` for the views under test; keyword
+    arguments become ``META`` entries.
+    """
+    def __init__(self, method='GET', path='/', **meta):
+        self.method, self.path, self.META = method, path, meta
+    def get_full_path(self):
+        return self.path
+
+
+class Response(dict):
+    """Just enough of ``HttpResponse`` to be looked at by the caches."""
+    def __init__(self, content=None, cookies=None, **headers):
+        dict.__init__(self, [(k.replace('_', '-'), v)
+                             for k, v in headers.items()])
+        self.content, self.cookies = content, cookies or {}
+    def has_header(self, header):
+        return header in self
+
+
+class BlockingView(View):
+    """Its calls count themselves in ``calls``, and wait for ``release``
+    to be set; use ``make_view`` to get a class with its own of both.
+    """
+    calls = 0
+    release = threading.Event()
+    def __call__(self, request, n=1):
+        type(self).calls += 1
+        self.release.wait()
+        if n == 'error':
+            raise ValueError('failed')
+        return [request, n]
+
+
+def make_view(base=BlockingView, **attrs):
+    """Return a new subclass of ``base`` with the class attributes
+    ``attrs``, e.g. options, and a ``calls`` counter and ``release``
+    event of its own.
+    """
+    attrs.setdefault('calls', 0)
+    attrs.setdefault('release', threading.Event())
+    return type('TestView', (base,), attrs)
+
+
+def release_later(view_class, delay=0.1):
+    timer = threading.Timer(delay, view_class.release.set)
+    timer.start()
+    return timer
+
+
+def call_concurrently(view, args_list):
+    """Call ``view`` from one thread per entry of ``args_list``; return
+    the results, or the exceptions raised, in the same order.
+    """
+    results = [None] * len(args_list)
+    def run(i, args):
+        try:
+            results[i] = view(*args)
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=run, args=(i, args))
+               for i, args in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
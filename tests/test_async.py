@@ -0,0 +1,106 @@
+"""Test views written as coroutines.
+"""
+
+import sys
+
+from unittest import SkipTest
+
+if sys.version_info < (3, 5):
+    raise SkipTest('native coroutines require Python 3.5')
+
+import asyncio
+from inspect import iscoroutinefunction
+
+from django_oopviews import create_view
+from tests.async_views import AsyncView, AsyncScopedView, MixedView, \
+    CachedAsyncView, CoalescedAsyncView, AsyncCompositeView, \
+    LimitedAsyncView, gather_calls
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+def test_async_hooks_and_view():
+    """Coroutine hooks and views are awaited in order.
+    """
+    testview = create_view(AsyncView)
+    assert asyncio.iscoroutinefunction(testview)
+    assert run(testview(21)) == 42
+    assert testview._instance.log == ['before']
+
+
+def test_async_before_can_return_response():
+    testview = create_view(AsyncView)
+    assert run(testview('short-circuit')) == 'before'
+
+
+def test_async_hooks_with_sync_method():
+    """A plain method is still wrapped in the coroutine hooks.
+    """
+    testview = create_view(AsyncView)
+    assert run(testview.sync(1)) == 4
+
+
+def test_async_nested_views():
+    testview = create_view(AsyncView)
+    assert asyncio.iscoroutinefunction(testview.sub)
+    assert run(testview.sub(3)) == -3
+
+
+def test_async_only_where_necessary():
+    """Only coroutine methods are made asynchronous if the hooks are
+    synchronous.
+    """
+    testview = create_view(MixedView)
+    assert testview() == ('sync', 'after')
+    assert not asyncio.iscoroutinefunction(testview)
+    assert iscoroutinefunction(testview.foo)
+    assert run(testview.foo()) == ('async', 'after')
+
+
+def test_async_request_scoped():
+    """Concurrent requests on a request scoped view do not share state.
+    """
+    testview = create_view(AsyncScopedView)
+    assert run(gather_calls(testview, range(50))) == list(range(50))
+    assert run(testview.static(5)) == 5
+
+
+def test_async_response_cache():
+    """Concurrent requests wait for a single one to build the response.
+    """
+    testview = create_view(CachedAsyncView)
+    assert asyncio.iscoroutinefunction(testview)
+    assert run(gather_calls(testview, ['/'] * 5)) == ['/'] * 5
+    assert CachedAsyncView.calls == 1
+
+
+def test_async_single_flight():
+    """Concurrent identical calls share one response, or exception.
+    """
+    testview = create_view(CoalescedAsyncView)
+    results = run(gather_calls(testview, ['/'] * 5 + ['/a']))
+    assert results == [['/']] * 5 + [['/a']]
+    assert CoalescedAsyncView.calls == 2
+
+    results = run(gather_calls(testview, ['error'] * 3,
+                               return_exceptions=True))
+    assert all(isinstance(result, ValueError) for result in results)
+    assert CoalescedAsyncView.calls == 3
+
+
+def test_async_composite():
+    """Branches run on the event loop when any of them is a coroutine.
+    """
+    testview = create_view(AsyncCompositeView)
+    assert asyncio.iscoroutinefunction(testview)
+    results, errors = run(testview('request'))
+    assert results == {'fast': 'request', 'slow': None, 'sync': 'sync'}
+    assert errors == ['slow']
+
+
+def test_async_concurrency_limit():
+    testview = create_view(LimitedAsyncView)
+    assert run(gather_calls(testview, [1, 2, 3])) == [1, 2, None]
+    assert LimitedAsyncView.concurrency_limit.info()['rejected'] == 1
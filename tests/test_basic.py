@@ -85,4 +85,65 @@ def test_proxy_what_attributes_are_wrapped():
             pass
     testview = create_view(TestView)
     assert not hasattr(testview, 'foo')
-    assert not hasattr(testview, '_bar')
\ No newline at end of file
+    assert not hasattr(testview, '_bar')
+
+def test_proxy_is_built_lazily():
+    """Methods and nested views are wrapped when first accessed, and
+    nested views are only created then.
+    """
+    created = []
+    class TestView(View):
+        def foo(self, *args, **kwargs):
+            return 1
+        class sub(View):
+            def __init__(self):
+                created.append(self)
+            def __call__(self, *args, **kwargs):
+                return 2
+    testview = create_view(TestView)
+    assert 'foo' not in type(testview).__dict__
+    assert created == []
+    assert 'foo' in dir(testview) and 'sub' in dir(testview)
+
+    assert testview.foo() == 1
+    assert testview.sub() == 2
+    assert testview.sub() == 2
+    assert len(created) == 1
+    assert 'foo' in type(testview).__dict__
+    assert hasattr(testview, 'sub') and not hasattr(testview, 'bar')
+
+
+def test_proxies_are_cached():
+    """Check that proxies are shared per view class and arguments, and
+    that nested views are only created once even if used in several views.
+    """
+    created = []
+    class Shared(View):
+        def __init__(self):
+            created.append(self)
+        def __call__(self, *args, **kwargs):
+            return 1
+    class TestView(View):
+        def __init__(self, value=None):
+            self.value = value
+        def __call__(self, *args, **kwargs):
+            return self.value
+        sub = Shared
+    class OtherView(View):
+        shared = Shared
+
+    testview = create_view(TestView)
+    assert create_view(TestView) is testview
+    assert create_view(TestView, value=1) is create_view(TestView, value=1)
+    assert create_view(TestView, value=1) is not testview
+    assert create_view(TestView, value=[1])() == [1]
+    assert create_view(TestView, value=[1]) is not \
+        create_view(TestView, value=[1])
+    assert create_view(TestView, True)() is True
+    assert type(create_view(TestView, 1)()) is int
+    assert create_view(TestView, (1.0,))() == (1.0,)
+    assert type(create_view(TestView, (1,))()[0]) is int
+
+    assert testview.sub is create_view(OtherView).shared
+    assert len(created) == 1
+    assert not hasattr(testview, '__dict__')
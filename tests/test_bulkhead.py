@@ -0,0 +1,73 @@
+"""Test limiting the concurrent calls of views with ``Bulkhead``.
+"""
+
+from django_oopviews import create_view
+from django_oopviews.bulkhead import Bulkhead, limit_concurrency
+from tests.helpers import BlockingView, call_concurrently, make_view, \
+    release_later
+
+
+def rejected(*args, **kwargs):
+    return 'rejected'
+
+
+class LimitedView(BlockingView):
+    @limit_concurrency(max_concurrent=1, reject=rejected)
+    def single(self, request):
+        self.release.wait()
+        return 'single'
+
+
+def limited_view(**options):
+    return make_view(LimitedView,
+                     concurrency_limit=Bulkhead(reject=rejected, **options))
+
+
+def test_excess_calls_are_rejected():
+    TestView = limited_view(max_concurrent=2)
+    testview = create_view(TestView)
+    release_later(TestView)
+    results = call_concurrently(testview, [('r',)] * 5)
+    assert (results.count(['r', 1]), results.count('rejected')) == (2, 3)
+    assert TestView.concurrency_limit.info() == {
+        'active': 0, 'waiting': 0, 'rejected': 3,
+        'max_concurrent': 2, 'max_queue': 0}
+
+
+def test_method_limit():
+    TestView = limited_view()
+    testview = create_view(TestView)
+    release_later(TestView)
+    results = call_concurrently(testview.single, [('r',)] * 3)
+    assert sorted(results) == ['rejected'] * 2 + ['single']
+
+
+def test_queue():
+    TestView = limited_view(max_concurrent=1, max_queue=2, queue_timeout=1)
+    testview = create_view(TestView)
+    release_later(TestView)
+    results = call_concurrently(testview, [('r',)] * 4)
+    assert (results.count(['r', 1]), results.count('rejected')) == (3, 1)
+
+
+def test_queue_timeout():
+    TestView = limited_view(max_concurrent=1, max_queue=2, queue_timeout=0.05)
+    testview = create_view(TestView)
+    release_later(TestView, 0.3)
+    results = call_concurrently(testview, [('r',)] * 3)
+    assert (results.count(['r', 1]), results.count('rejected')) == (1, 2)
+    assert TestView.concurrency_limit.rejected == 2
+
+
+def test_subclasses_share_the_limit():
+    TestView = limited_view(max_concurrent=1)
+    SubView = make_view(TestView, release=TestView.release)
+    OwnView = make_view(TestView, release=TestView.release,
+                        concurrency_limit=Bulkhead(max_concurrent=1))
+    views = [create_view(view) for view in (TestView, SubView, OwnView)]
+    release_later(TestView)
+    results = call_concurrently(lambda i: views[i]('r'), [(0,), (1,), (2,)])
+    assert (results.count(['r', 1]), results.count('rejected')) == (2, 1)
+    # the one with a limit of its own was not rejected
+    assert results[2] == ['r', 1]
+    assert SubView.concurrency_limit is TestView.concurrency_limit
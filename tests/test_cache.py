@@ -0,0 +1,26 @@
+"""Test the caches in the ``cache`` module.
+"""
+
+from django_oopviews.cache import LRUCache, LocalCache
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.info() == {'hits': 2, 'misses': 1, 'maxsize': 2, 'size': 2}
+
+
+def test_local_cache_expiry():
+    cache = LocalCache(maxsize=2)
+    cache.set('a', 1, -1)
+    cache.set('b', 2)
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    cache.set('c', 3)
+    cache.set('d', 4)
+    assert cache.get('b') is None
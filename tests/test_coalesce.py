@@ -0,0 +1,81 @@
+"""Test coalescing identical concurrent calls with ``SingleFlight``.
+"""
+
+import threading
+
+from django_oopviews import View, create_view
+from django_oopviews.coalesce import SingleFlight, coalesce_calls
+from tests.helpers import BlockingView, Request, Response, \
+    call_concurrently, make_view, release_later
+
+
+class CoalescedView(BlockingView):
+    @coalesce_calls(vary_on=['Accept'])
+    def other(self, request):
+        return self.calls
+
+
+def test_identical_calls_are_coalesced():
+    TestView = make_view(single_flight=SingleFlight())
+    testview = create_view(TestView)
+    release_later(TestView)
+    results = call_concurrently(testview, [('/a',)] * 10 + [('/a', 2)])
+    assert results == [['/a', 1]] * 10 + [['/a', 2]]
+    assert TestView.calls == 2
+    # every call gets its own copy
+    assert len(set(id(result) for result in results)) == 11
+
+
+def test_errors_are_propagated():
+    TestView = make_view(single_flight=SingleFlight())
+    testview = create_view(TestView)
+    release_later(TestView)
+    results = call_concurrently(testview, [('/a', 'error')] * 5)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert TestView.calls == 1
+    # nothing is left behind for later calls
+    assert testview('/a') == ['/a', 1]
+
+
+def test_waiting_times_out():
+    TestView = make_view(single_flight=SingleFlight(timeout=0.01))
+    testview = create_view(TestView)
+    release_later(TestView, 0.2)
+    assert call_concurrently(testview, [('/a',)] * 3) == [['/a', 1]] * 3
+    assert TestView.calls == 3
+
+
+def test_unsafe_methods_are_not_coalesced():
+    TestView = make_view(CoalescedView, single_flight=SingleFlight())
+    testview = create_view(TestView)
+    release_later(TestView)
+    call_concurrently(testview.other, [(Request('GET'),)] * 3)
+    call_concurrently(testview, [(Request('POST'),)] * 3)
+    assert TestView.calls == 3
+
+
+def test_private_and_varying_responses_are_not_shared():
+    class TestView(View):
+        single_flight = SingleFlight()
+        calls = 0
+        release = threading.Event()
+        def __call__(self, request, header, value):
+            TestView.calls += 1
+            self.release.wait()
+            response = Response()
+            response[header] = value
+            response['Encoding'] = request.META['HTTP_ACCEPT_ENCODING']
+            return response
+    testview = create_view(TestView)
+    release_later(TestView)
+    encodings = ['gzip', 'br', 'gzip', 'br']
+    results = call_concurrently(testview, [
+        (Request(HTTP_ACCEPT_ENCODING=encoding), 'Vary', 'Accept-Encoding')
+        for encoding in encodings])
+    assert [result['Encoding'] for result in results] == encodings
+    assert TestView.calls < 4
+    TestView.calls = 0
+    request = Request(HTTP_ACCEPT_ENCODING='gzip')
+    call_concurrently(testview,
+                      [(request, 'Cache-Control', 'private')] * 3)
+    assert TestView.calls == 3
@@ -0,0 +1,82 @@
+"""Test running the branches of a ``CompositeView`` concurrently.
+"""
+
+import threading
+import time
+from unittest import SkipTest
+
+from django_oopviews import View, create_view
+from django_oopviews.composite import CompositeView, BranchTimeout
+
+
+class TestView(CompositeView):
+    branches = ['first', 'second', 'sub']
+    started = []
+
+    def first(self, request):
+        TestView.started.append('first')
+        time.sleep(0.1)
+        return request + 1
+
+    def second(self, request):
+        TestView.started.append('second')
+        time.sleep(0.1)
+        return request + 2
+
+    class sub(View):
+        def __before__(self, args, kwargs):
+            args[0] *= 10
+        def __call__(self, request):
+            return request
+
+
+def test_branches_run_concurrently():
+    testview = create_view(TestView)
+    start = time.time()
+    assert testview(1) == {'first': 2, 'second': 3, 'sub': 10}
+    # the nested view ran with its hooks, and nothing waited for another
+    assert time.time() - start < 0.19
+    assert sorted(TestView.started) == ['first', 'second']
+
+
+def test_errors_and_timeouts_are_isolated():
+    class FailingView(CompositeView):
+        branches = {'ok': None, 'slow': 0.05, 'broken': None}
+        def ok(self, request):
+            return 'ok'
+        def slow(self, request):
+            time.sleep(0.3)
+            return 'slow'
+        def broken(self, request):
+            raise ValueError(request)
+        def _merge(self, request, results, errors):
+            return results, errors
+    testview = create_view(FailingView)
+    start = time.time()
+    results, errors = testview('request')
+    assert time.time() - start < 0.25
+    assert results == {'ok': 'ok', 'slow': None, 'broken': None}
+    assert sorted(errors) == ['broken', 'slow']
+    assert isinstance(errors['broken'], ValueError)
+    assert isinstance(errors['slow'], BranchTimeout)
+
+
+def test_branches_close_old_connections():
+    try:
+        from django import db
+    except ImportError:
+        raise SkipTest('requires Django')
+    name = 'close_old_connections'
+    if not hasattr(db, name):
+        name = 'close_connection'
+    original = getattr(db, name)
+    threads = []
+    setattr(db, name,
+            lambda **kwargs: threads.append(threading.current_thread()))
+    try:
+        create_view(TestView)(1)
+    finally:
+        setattr(db, name, original)
+    # before and after each of the three branches, in the pool's threads
+    assert len(threads) == 6
+    assert threading.current_thread() not in threads
@@ -0,0 +1,90 @@
+"""Test answering conditional GET requests with the ``__etag__`` and
+``__last_modified__`` hooks.
+"""
+
+import sys
+from datetime import datetime
+from unittest import SkipTest
+
+from django.http import HttpResponse
+from django.utils.http import http_date
+
+from django_oopviews import View, create_view
+from tests.helpers import Request
+
+
+class TestView(View):
+    calls = 0
+    def __etag__(self, request, version=1):
+        return 'v%s' % version
+    def __after__(self, response):
+        TestView.calls += 1
+        return response
+    def __call__(self, request, version=1):
+        return HttpResponse('content')
+    def other(self, request, version=1):
+        return HttpResponse('other')
+
+
+def test_etag():
+    testview = create_view(TestView)
+    response = testview(Request())
+    assert response.status_code == 200
+    assert response['ETag'] == '"v1"'
+    calls = TestView.calls
+
+    response = testview(Request(HTTP_IF_NONE_MATCH='"v1"'))
+    assert response.status_code == 304
+    response = testview.other(Request(HTTP_IF_NONE_MATCH='"v0", "v1"'))
+    assert response.status_code == 304
+    assert TestView.calls == calls
+
+    response = testview(Request(HTTP_IF_NONE_MATCH='"v1"'), version=2)
+    assert response.status_code == 200
+    assert response['ETag'] == '"v2"'
+    # only safe methods
+    response = testview(Request('POST', HTTP_IF_NONE_MATCH='"v1"'))
+    assert response.status_code == 200
+
+
+def test_last_modified_inherited():
+    class SubView(TestView):
+        __etag__ = None
+        def __last_modified__(self, request, version=1):
+            return datetime(2010, 1, version)
+    testview = create_view(SubView)
+    response = testview(Request())
+    assert response['Last-Modified'] == 'Fri, 01 Jan 2010 00:00:00 GMT'
+    assert 'ETag' not in response
+
+    since = http_date(1262304000 + 3600)
+    assert testview(Request(HTTP_IF_MODIFIED_SINCE=since)).status_code == 304
+    assert testview(Request(HTTP_IF_MODIFIED_SINCE=since),
+                    version=2).status_code == 200
+    assert testview(Request(HTTP_IF_MODIFIED_SINCE='garbage')).status_code \
+        == 200
+
+
+def test_if_none_match_takes_precedence():
+    class BothView(TestView):
+        def __last_modified__(self, request, version=1):
+            return datetime(2010, 1, 2)
+    testview = create_view(BothView)
+    since = http_date(1262304000)
+    assert testview(Request(HTTP_IF_NONE_MATCH='"v1"',
+                            HTTP_IF_MODIFIED_SINCE=since)).status_code == 304
+    assert testview(Request(HTTP_IF_NONE_MATCH='"v0"',
+        HTTP_IF_MODIFIED_SINCE=http_date())).status_code == 200
+    assert testview(Request(HTTP_IF_NONE_MATCH='W/"v1"')).status_code == 304
+
+
+def test_async_hooks():
+    if sys.version_info < (3, 5):
+        raise SkipTest('native coroutines require Python 3.5')
+    import asyncio
+    from tests.async_views import ConditionalAsyncView
+    testview = create_view(ConditionalAsyncView)
+    run = asyncio.new_event_loop().run_until_complete
+    assert run(testview(Request())) == 'content'
+    response = run(testview(Request(HTTP_IF_NONE_MATCH='"v1"')))
+    assert response.status_code == 304
@@ -0,0 +1,301 @@
+"""Test the ``ctn`` content type negotiation module.
+"""
+
+import json
+import zlib
+from xml.etree import ElementTree
+
+from django.http import HttpResponse
+
+from django_oopviews import ctn, create_view
+from django_oopviews.cache import LocalCache, ResponseCache
+from tests.helpers import Request
+
+
+class TestView(ctn.AbstractCTNView):
+    ctn_accept_binding = {
+        'text/html': (1, 'html'),
+        'text/plain': (0.5, 'text'),
+        'text/*': 'text',
+        'application/json': 'json',
+        '*/*': 'html',
+    }
+    def html(self, request):
+        return 'html'
+    def text(self, request):
+        return 'text'
+    def json(self, request):
+        return 'json'
+
+
+def test_exact():
+    testview = create_view(TestView)
+    assert testview(Request(HTTP_ACCEPT='application/json')) == 'json'
+    assert testview(Request(HTTP_ACCEPT='text/plain')) == 'text'
+    assert testview(Request(HTTP_ACCEPT='text/html')) == 'html'
+
+
+def test_family_fallback():
+    """An exact type without binding uses the family's wildcard binding.
+    """
+    testview = create_view(TestView)
+    assert testview(Request(HTTP_ACCEPT='text/csv')) == 'text'
+
+
+def test_wildcards():
+    """Wildcard requests use the provided type with the highest priority.
+    """
+    testview = create_view(TestView)
+    assert testview(Request(HTTP_ACCEPT='text/*')) == 'html'
+    assert testview(Request(HTTP_ACCEPT='*/*')) == 'html'
+    assert testview(Request()) == 'html'
+
+
+def test_quality():
+    testview = create_view(TestView)
+    for accept, handler in [
+            ('text/html;q=0.2, application/json', 'json'),
+            ('text/html, application/json;q=0.2', 'html'),
+            ('image/png, application/json;q=0.1', 'json')]:
+        assert testview(Request(HTTP_ACCEPT=accept)) == handler
+
+
+def test_not_acceptable():
+    testview = create_view(TestView)
+    response = testview(Request(HTTP_ACCEPT='image/png'))
+    assert isinstance(response, ctn.HttpResponseNotAcceptable)
+
+
+def test_binding_overridden_in_subclass():
+    """The compiled table follows ``ctn_accept_binding`` of each class.
+    """
+    class SubView(TestView):
+        ctn_accept_binding = {'application/json': 'text'}
+    testview, subview = create_view(TestView), create_view(SubView)
+    assert testview(Request(HTTP_ACCEPT='application/json')) == 'json'
+    assert subview(Request(HTTP_ACCEPT='application/json')) == 'text'
+    assert isinstance(subview(Request(HTTP_ACCEPT='text/html')),
+                      ctn.HttpResponseNotAcceptable)
+
+    SubView.ctn_accept_binding = {'application/json': 'html'}
+    assert subview(Request(HTTP_ACCEPT='application/json')) == 'html'
+
+
+def test_negotiation_cache():
+    """The handler negotiated for an Accept header is remembered.
+    """
+    class CachedView(TestView):
+        ctn_cache_size = 2
+    testview = create_view(CachedView)
+    for accept in ('text/html', 'text/html', 'image/png', 'text/html'):
+        testview(Request(HTTP_ACCEPT=accept))
+    assert isinstance(testview(Request(HTTP_ACCEPT='image/png')),
+                      ctn.HttpResponseNotAcceptable)
+    info = CachedView._ctn_cache_info()
+    assert (info['hits'], info['misses'], info['size']) == (3, 2, 2)
+
+    # least recently used entries are discarded
+    testview(Request(HTTP_ACCEPT='application/json'))
+    testview(Request(HTTP_ACCEPT='text/html'))
+    info = CachedView._ctn_cache_info()
+    assert (info['hits'], info['misses'], info['size']) == (3, 4, 2)
+
+
+def test_negotiation_cache_disabled():
+    class UncachedView(TestView):
+        ctn_cache_size = 0
+    testview = create_view(UncachedView)
+    assert testview(Request(HTTP_ACCEPT='text/html')) == 'html'
+    assert UncachedView._ctn_cache_info() is None
+
+
+class RenderedView(ctn.AbstractCTNView):
+    ctn_accept_binding = {
+        'text/html': 'html',
+        'application/json': 'json',
+        'text/xml': 'xml',
+        'image/*': 'xml',
+        '*/*': 'html',
+    }
+    loads = 0
+    def _ctn_data(self, request, id):
+        RenderedView.loads += 1
+        return {'id': id, 'tags': ['a', '<b>'], 'draft': False,
+                'note': None}
+    def html(self, request, id):
+        return 'html'
+
+
+def test_renderers():
+    testview = create_view(RenderedView)
+    assert testview(Request(HTTP_ACCEPT='text/html'), 1) == 'html'
+    response = testview(Request(HTTP_ACCEPT='application/json'), 1)
+    assert response['Content-Type'] == 'application/json; charset=utf-8'
+    assert json.loads(response.content.decode('utf-8')) == \
+        {'id': 1, 'tags': ['a', '<b>'], 'draft': False, 'note': None}
+
+    response = testview(Request(HTTP_ACCEPT='text/xml'), 1)
+    assert response['Content-Type'] == 'text/xml; charset=utf-8'
+    root = ElementTree.fromstring(response.content)
+    assert root.find('id').text == '1'
+    assert [item.text for item in root.find('tags')] == ['a', '<b>']
+    assert root.find('draft').text == 'false'
+    assert root.find('note').text is None
+
+    # the wildcard binding renders with the renderer's own content type
+    response = testview(Request(HTTP_ACCEPT='image/png'), 1)
+    assert response['Content-Type'] == 'application/xml; charset=utf-8'
+
+
+def test_render_cache():
+    class CachedRenderedView(RenderedView):
+        ctn_render_cache = LocalCache()
+    testview = create_view(CachedRenderedView)
+    RenderedView.loads = 0
+    json_request = Request(path='/1', HTTP_ACCEPT='application/json')
+    xml_request = Request(path='/1', HTTP_ACCEPT='text/xml')
+    json_response = testview(json_request, 1)
+    xml_response = testview(xml_request, 1)
+    assert testview(json_request, 1).content == json_response.content
+    assert testview(xml_request, 1).content == xml_response.content
+    testview(Request(path='/2', HTTP_ACCEPT='application/json'), 2)
+    assert RenderedView.loads == 3
+
+
+def test_parse_qvalues():
+    assert ctn.parse_qvalues('gzip;q=0.5, br ,deflate;level=1;q=0.2, x;q=2') \
+        == [('gzip', 0.5), ('br', 1), ('deflate', 0.2)]
+    assert ctn.parse_qvalues('de;q=abc, fr;q=, en;q=nan, it;q=0.1') == \
+        [('it', 0.1)]
+    assert ctn.negotiate_language('de;q=abc', ('en', 'de')) == 'en'
+
+
+def test_negotiate_language():
+    available = ('en', 'de-AT')
+    assert ctn.negotiate_language(None, available) == 'en'
+    assert ctn.negotiate_language('fr, de;q=0.8, en;q=0.5', available) \
+        == 'de-AT'
+    assert ctn.negotiate_language('EN-US', available) == 'en'
+    assert ctn.negotiate_language('de-at;q=0, fr', available) == 'en'
+
+
+def test_compressed_variants():
+    class CompressedView(RenderedView):
+        ctn_encodings = ('gzip', 'deflate')
+        ctn_languages = ('en', 'de')
+        ctn_compress_min_size = 10
+        def _ctn_data(self, request, id):
+            return {'language': request.ctn_language, 'text': 'x' * 1000}
+    testview = create_view(CompressedView)
+
+    request = Request(HTTP_ACCEPT='application/json')
+    request.META['HTTP_ACCEPT_ENCODING'] = 'deflate, gzip;q=0.5'
+    request.META['HTTP_ACCEPT_LANGUAGE'] = 'de'
+    response = testview(request, 1)
+    assert response['Content-Encoding'] == 'deflate'
+    assert response['Vary'] == 'Accept, Accept-Language, Accept-Encoding'
+    data = json.loads(zlib.decompress(response.content).decode('utf-8'))
+    assert data['language'] == 'de'
+
+    request.META['HTTP_ACCEPT_ENCODING'] = 'gzip'
+    response = testview(request, 1)
+    assert response['Content-Encoding'] == 'gzip'
+    assert int(response['Content-Length']) == len(response.content) < 100
+    content = zlib.decompress(response.content, 16 + zlib.MAX_WBITS)
+    assert json.loads(content.decode('utf-8'))['text'] == 'x' * 1000
+
+    # the same content is only compressed once per coding
+    testview(request, 1)
+    info = CompressedView._ctn_get_table().variants.info()
+    assert (info['hits'], info['size']) == (1, 2)
+
+    del request.META['HTTP_ACCEPT_ENCODING']
+    response = testview(request, 1)
+    assert not response.has_header('Content-Encoding')
+    assert response['Vary'] == 'Accept, Accept-Language, Accept-Encoding'
+
+
+def test_response_cache_varies_on_negotiation():
+    class CachedView(RenderedView):
+        response_cache = ResponseCache(timeout=60)
+        ctn_encodings = ('gzip',)
+        ctn_compress_min_size = 10
+        def _ctn_data(self, request, id):
+            return {'text': 'x' * 1000}
+    testview = create_view(CachedView)
+    request = Request(HTTP_ACCEPT='application/json')
+    request.META['HTTP_ACCEPT_ENCODING'] = 'gzip'
+    assert testview(request, 1)['Content-Encoding'] == 'gzip'
+    assert testview(Request(HTTP_ACCEPT='text/html'), 1) == 'html'
+    response = testview(Request(HTTP_ACCEPT='application/json'), 1)
+    assert not response.has_header('Content-Encoding')
+    assert testview(request, 1)['Content-Encoding'] == 'gzip'
+
+
+def test_language_is_per_request():
+    class LanguageView(RenderedView):
+        ctn_languages = ('en', 'de')
+        ctn_render_cache = LocalCache()
+        def _ctn_data(self, request, id):
+            return {'language': request.ctn_language}
+    testview = create_view(LanguageView)
+    german = Request(HTTP_ACCEPT='application/json')
+    german.META['HTTP_ACCEPT_LANGUAGE'] = 'de'
+    english = Request(HTTP_ACCEPT='application/json')
+    for request, language in [(german, 'de'), (english, 'en'),
+                              (german, 'de'), (english, 'en')]:
+        response = testview(request, 1)
+        assert json.loads(response.content.decode('utf-8')) == \
+            {'language': language}
+        assert not hasattr(testview._instance, 'ctn_language')
+
+
+def test_render_xml_keys():
+    content = ctn.render_xml({'a b': 1, 1: 'x', 'k><evil/': 2, 'ok': 3})
+    root = ElementTree.fromstring(content)
+    assert root.find('ok').text == '3'
+    assert dict((item.get('key'), item.text) for item in root) == \
+        {'a b': '1', '1': 'x', 'k><evil/': '2', None: '3'}
+
+
+def test_static_and_class_method_handlers():
+    class DescriptorView(ctn.AbstractCTNView):
+        ctn_accept_binding = {'text/html': 'html', 'text/plain': 'text'}
+        @staticmethod
+        def html(request):
+            return 'static'
+        @classmethod
+        def text(cls, request):
+            return cls.__name__
+    testview = create_view(DescriptorView)
+    assert testview(Request(HTTP_ACCEPT='text/html')) == 'static'
+    assert testview(Request(HTTP_ACCEPT='text/plain')) == 'DescriptorView'
+
+
+def test_compressed_variants_have_weak_etags():
+    class TaggedView(RenderedView):
+        ctn_encodings = ('gzip',)
+        ctn_compress_min_size = 10
+        def __etag__(self, request, id):
+            return 'v%s' % id
+        def _ctn_data(self, request, id):
+            return {'text': 'x' * 1000}
+    testview = create_view(TaggedView)
+    request = Request(HTTP_ACCEPT='application/json')
+    assert testview(request, 1)['ETag'] == '"v1"'
+    request.META['HTTP_ACCEPT_ENCODING'] = 'gzip'
+    response = testview(request, 1)
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['ETag'] == 'W/"v1"'
+    request.META['HTTP_IF_NONE_MATCH'] = 'W/"v1"'
+    assert testview(request, 1).status_code == 304
+
+    class HandlerTaggedView(TaggedView):
+        __etag__ = None
+        def json(self, request, id):
+            response = HttpResponse('x' * 1000)
+            response['ETag'] = '"v2"'
+            return response
+    request = Request(HTTP_ACCEPT='application/json')
+    request.META['HTTP_ACCEPT_ENCODING'] = 'gzip'
+    assert create_view(HandlerTaggedView)(request, 1)['ETag'] == 'W/"v2"'
@@ -0,0 +1,88 @@
+"""Test dispatching to a view method per HTTP method.
+"""
+
+from django.http import HttpResponse
+
+from django_oopviews import View, create_view, simple
+from tests.helpers import Request
+
+
+class TestView(View):
+    calls = []
+    def __before__(self, args, kwargs):
+        TestView.calls.append('before')
+    def __after__(self, response):
+        return response + '!'
+    def get(self, request, id):
+        return 'get %s' % id
+    def post(self, request, id):
+        return 'post %s' % id
+
+    class sub(View):
+        def delete(self, request):
+            return 'deleted'
+
+
+def test_dispatch():
+    testview = create_view(TestView)
+    assert testview(Request('GET'), 1) == 'get 1!'
+    assert testview(Request('POST'), id=2) == 'post 2!'
+    assert testview(Request('HEAD'), 1) == 'get 1!'
+    assert testview.sub(Request('DELETE')) == 'deleted'
+
+
+def test_not_allowed_and_options():
+    testview = create_view(TestView)
+    del TestView.calls[:]
+    response = testview(Request('PUT'), 1)
+    assert response.status_code == 405
+    assert response['Allow'] == 'GET, HEAD, OPTIONS, POST'
+    response = testview(Request('OPTIONS'), 1)
+    assert response.status_code == 200
+    assert response['Allow'] == 'GET, HEAD, OPTIONS, POST'
+    # the hooks did not run
+    assert TestView.calls == []
+
+    assert create_view(TestView.sub)(Request('GET')).status_code == 405
+
+
+def test_scoped_view():
+    class ScopedView(View):
+        request_scoped = True
+        def __before__(self, args, kwargs):
+            self.method = args[0].method
+        def post(self, request):
+            return self.method
+    testview = create_view(ScopedView)
+    assert testview(Request('POST')) == 'POST'
+    assert not hasattr(testview._instance, 'method')
+
+
+def test_head_is_rendered_like_get():
+    """HEAD requests get the same status and headers as GET requests,
+    including those set when rendering.
+    """
+    class TestView(simple.SimpleView):
+        def get(self):
+            return 'template.html', {'page': 1}
+        def _render(self, template_name, context):
+            response = HttpResponse('%s %s' % (template_name, context))
+            response['Content-Length'] = str(len(response.content))
+            return response
+    testview = create_view(TestView)
+    head = testview(Request('HEAD'))
+    get = testview(Request('GET'))
+    assert head.status_code == get.status_code == 200
+    assert sorted(head.items()) == sorted(get.items())
+    assert head.content == get.content
+
+
+def test_call_is_not_replaced():
+    class TestView(View):
+        def __call__(self, request):
+            return 'call'
+        def get(self, request):
+            return 'get'
+    testview = create_view(TestView)
+    assert testview(Request('GET')) == 'call'
+    assert testview.get(Request('GET')) == 'get'
@@ -0,0 +1,94 @@
+"""Test running CPU-bound view methods in worker processes.
+"""
+
+import os
+from unittest import SkipTest
+
+from django_oopviews import View, create_view
+from django_oopviews.offload import ProcessPool, cpu_bound
+from tests.helpers import Request
+
+try:
+    from django_oopviews.simple import SimpleView
+except ImportError:
+    SimpleView = View   # without Django
+
+
+pool = ProcessPool(2)
+
+
+class TestView(View):
+    request_scoped = True
+
+    def __before__(self, args, kwargs):
+        self.request_pid = os.getpid()
+        self.factor = int(args[0].META.get('HTTP_X_FACTOR', 1))
+
+    def __after__(self, response):
+        return response, os.getpid()
+
+    @cpu_bound(pool=pool)
+    def __call__(self, request, n):
+        return request, self.factor * n, self.request_pid, os.getpid()
+
+    @cpu_bound(pool=pool)
+    def unpicklable(self, request, n):
+        return n(), os.getpid()
+
+    @cpu_bound(pool=pool)
+    def unpicklable_result(self, request, n):
+        return lambda: n, os.getpid()
+
+
+class YearView(SimpleView):
+    request_scoped = True
+    args = ['year']
+
+    @cpu_bound(pool=pool)
+    def __call__(self):
+        return self.year * 2, self.request, os.getpid()
+
+
+def test_method_runs_in_pool():
+    testview = create_view(TestView)
+    try:
+        (request, result, request_pid, pid), after_pid = \
+            testview(Request(HTTP_X_FACTOR='3'), 2)
+    finally:
+        pool.close()
+    # the request is not sent to the worker
+    assert (request, result) == (None, 6)
+    assert request_pid == after_pid == os.getpid()
+    assert pid != os.getpid()
+
+
+def test_fallback_when_not_picklable():
+    testview = create_view(TestView)
+    fallbacks = pool.fallbacks
+    (result, pid), after_pid = testview.unpicklable(Request(),
+                                                    lambda: 'local')
+    assert result == 'local'
+    assert pid == os.getpid()
+    assert pool.fallbacks == fallbacks + 1
+
+    try:
+        (result, pid), after_pid = testview.unpicklable_result(Request(), 1)
+    finally:
+        pool.close()
+    assert result() == 1
+    assert pid == os.getpid()
+    assert pool.fallbacks == fallbacks + 2
+
+
+def test_simple_view():
+    """The request is stored on a ``SimpleView``, rather than passed.
+    """
+    if SimpleView is View:
+        raise SkipTest('SimpleView requires Django')
+    testview = create_view(YearView)
+    try:
+        result, request, pid = testview(Request(), 2010)
+    finally:
+        pool.close()
+    assert (result, request) == (4020, None)
+    assert pid != os.getpid()
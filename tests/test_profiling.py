@@ -0,0 +1,107 @@
+"""Test sampling profiles of view calls.
+"""
+
+import cProfile
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+
+from django_oopviews import View, create_view
+from django_oopviews.profiling import ProfileRegistry, view_name
+from tests.helpers import make_view
+
+
+def busy(n):
+    return sum(range(n))
+
+
+class BusyView(View):
+    def __call__(self, request):
+        return busy(100)
+    def other(self, request):
+        return busy(10)
+
+
+def profiled_functions(stats):
+    return set(name for (filename, line, name) in stats.stats)
+
+
+def test_profiling_is_off_by_default():
+    registry = ProfileRegistry()
+    testview = create_view(make_view(BusyView, profiling=registry))
+    assert testview(None) == 4950
+    assert registry.profiles == {}
+
+
+def test_enable_and_disable_at_runtime():
+    registry = ProfileRegistry()
+    TestView = make_view(BusyView, profiling=registry)
+    testview = create_view(TestView)
+    testview(None)
+
+    registry.enable(TestView)
+    for i in range(3):
+        testview(None)
+    testview.other(None)
+    assert registry.samples == {view_name(TestView): 4}
+    assert 'busy' in profiled_functions(registry.stats(TestView))
+
+    registry.disable(TestView)
+    testview(None)
+    assert registry.samples == {view_name(TestView): 4}
+
+
+def test_method_and_rate():
+    registry = ProfileRegistry()
+    TestView = make_view(BusyView, profiling=registry)
+    testview = create_view(TestView)
+    registry.enable(TestView, rate=0.5, method='other')
+    for i in range(200):
+        testview(None)
+        testview.other(None)
+    assert 50 < registry.samples[view_name(TestView)] < 150
+
+
+def test_dump():
+    registry = ProfileRegistry()
+    TestView = make_view(BusyView, profiling=registry)
+    testview = create_view(TestView)
+    registry.enable(view_name(TestView))
+    testview(None)
+    directory = tempfile.mkdtemp()
+    try:
+        paths = registry.dump(directory)
+        assert paths == [os.path.join(directory,
+                                      '%s.prof' % view_name(TestView))]
+        assert 'busy' in profiled_functions(pstats.Stats(paths[0]))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_concurrent_and_nested_profilers():
+    """Sampled calls never fail because of another active profiler.
+    """
+    registry = ProfileRegistry()
+    TestView = make_view(BusyView, profiling=registry)
+    testview = create_view(TestView)
+    registry.enable(TestView)
+    results = []
+    def worker():
+        for i in range(20):
+            results.append(testview(None))
+    threads = [threading.Thread(target=worker) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [4950] * 80
+    assert 0 < registry.samples[view_name(TestView)] <= 80
+
+    other = cProfile.Profile()
+    other.enable()
+    try:
+        assert testview(None) == 4950
+    finally:
+        other.disable()
@@ -0,0 +1,148 @@
+"""Test caching the responses of views.
+"""
+
+import threading
+import time
+
+from django_oopviews import View, create_view
+from django_oopviews.cache import ResponseCache, cache_response, LocalCache
+from tests.helpers import Request, Response
+
+
+def test_class_level_cache():
+    """A cache hit skips the view and its hooks altogether.
+    """
+    class TestView(View):
+        response_cache = ResponseCache(timeout=60)
+        calls = 0
+        def __before__(self, args, kwargs):
+            TestView.calls += 1
+        def __call__(self, request, n=1):
+            return [request.path, n]
+        def foo(self, request):
+            return 'foo'
+    testview = create_view(TestView)
+    assert testview(Request(path='/a')) == ['/a', 1]
+    assert testview(Request(path='/a')) == ['/a', 1]
+    assert testview(Request(path='/a'), n=2) == ['/a', 2]
+    assert testview(Request(path='/b')) == ['/b', 1]
+    assert testview.foo(Request(path='/a')) == 'foo'
+    assert testview.foo(Request(path='/a')) == 'foo'
+    assert TestView.calls == 4
+
+    # only safe methods are cached
+    testview(Request('POST', '/a'))
+    assert TestView.calls == 5
+
+
+def test_cached_responses_are_copies():
+    class TestView(View):
+        response_cache = ResponseCache(timeout=60)
+        def __call__(self, request):
+            return {'a': 1}
+    testview = create_view(TestView)
+    testview(Request())['a'] = 2
+    assert testview(Request()) == {'a': 1}
+
+
+def test_method_level_cache():
+    calls = []
+    class TestView(View):
+        @cache_response(timeout=60, vary_on=['Accept-Language'],
+                        key=lambda request, id: str(id))
+        def foo(self, request, id):
+            calls.append(id)
+            return id
+        def bar(self, request, id):
+            calls.append(id)
+            return id
+    testview = create_view(TestView)
+    testview.foo(Request(path='/a'), 1)
+    testview.foo(Request(path='/b'), 1)
+    testview.foo(Request(path='/b', HTTP_ACCEPT_LANGUAGE='de'), 1)
+    testview.bar(Request(), 2)
+    testview.bar(Request(), 2)
+    assert calls == [1, 1, 2, 2]
+
+
+def test_stale_responses_while_rebuilding():
+    """Only a single request rebuilds an expired entry.
+    """
+    backend = LocalCache()
+    calls = []
+    class TestView(View):
+        response_cache = ResponseCache(timeout=0.1, stale=60,
+                                       backend=backend)
+        def __call__(self, request):
+            calls.append(1)
+            time.sleep(0.2)
+            return len(calls)
+    testview = create_view(TestView)
+    assert testview(Request()) == 1
+    time.sleep(0.15)
+
+    results = []
+    def worker():
+        results.append(testview(Request()))
+    threads = [threading.Thread(target=worker) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 2
+    assert sorted(results) == [1] * 9 + [2]
+
+
+def test_key_includes_host_and_method():
+    class HostRequest(Request):
+        def __init__(self, host, method='GET'):
+            Request.__init__(self, method, '/a')
+            self.host = host
+        def build_absolute_uri(self):
+            return 'http://%s%s' % (self.host, self.path)
+    class TestView(View):
+        response_cache = ResponseCache(timeout=60)
+        def __call__(self, request):
+            return request.method + request.host
+    testview = create_view(TestView)
+    assert testview(HostRequest('a.com')) == 'GETa.com'
+    assert testview(HostRequest('b.com')) == 'GETb.com'
+    assert testview(HostRequest('a.com', 'HEAD')) == 'HEADa.com'
+    assert testview(HostRequest('a.com')) == 'GETa.com'
+
+
+def test_response_vary_headers():
+    """Responses are cached separately for every value of the request
+    headers named in their ``Vary`` header.
+    """
+    calls = []
+    class TestView(View):
+        response_cache = ResponseCache(timeout=60)
+        def __call__(self, request):
+            calls.append(1)
+            encoding = request.META.get('HTTP_ACCEPT_ENCODING')
+            return Response(encoding, Vary='Accept-Encoding')
+    testview = create_view(TestView)
+    assert testview(Request(HTTP_ACCEPT_ENCODING='gzip')).content == 'gzip'
+    assert testview(Request()).content is None
+    assert testview(Request(HTTP_ACCEPT_ENCODING='gzip')).content == 'gzip'
+    assert testview(Request()).content is None
+    assert len(calls) == 2
+
+
+def test_private_responses_are_not_cached():
+    calls = []
+    class TestView(View):
+        response_cache = ResponseCache(timeout=60)
+        def __call__(self, request, kind):
+            calls.append(kind)
+            if kind == 'cookie':
+                return Response(kind, cookies={'session': 'x'})
+            if kind == 'vary':
+                return Response(kind, Vary='*')
+            return Response(kind, Cache_Control='max-age=0, %s' % kind)
+    testview = create_view(TestView)
+    for kind in ('cookie', 'vary', 'private', 'no-store'):
+        testview(Request(), kind)
+        testview(Request(), kind)
+    assert len(calls) == 8
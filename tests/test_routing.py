@@ -0,0 +1,102 @@
+"""Test resolving URL paths to the methods and nested views of a proxy.
+"""
+
+from django.http import Http404
+
+from django_oopviews import View, create_view
+from django_oopviews.routing import Router
+from django_oopviews.simple import SimpleView
+from tests.helpers import Request
+
+
+class TestView(View):
+    def __call__(self, request, id=None):
+        return 'index %s' % id
+    def by_author(self, request, author, limit=30):
+        return 'by_author %s %s' % (author, limit)
+    def search(self, request, *terms):
+        return 'search %s' % '+'.join(terms)
+
+    class comments(View):
+        def get(self, request, id):
+            return 'comment %s' % id
+        class latest(View):
+            def __call__(self, request):
+                return 'latest'
+
+    class admin(View):
+        def stats(self, request):
+            return 'stats'
+
+
+class BookView(SimpleView):
+    args = ['id']
+    kwargs = {'limit': 30}
+    def __call__(self):
+        return 'book %s' % self.id
+    def by_author(self):
+        return 'by_author %s %s' % (self.id, self.limit)
+
+
+def assert_404(router, path):
+    try:
+        router(Request(), path)
+    except Http404:
+        pass
+    else:
+        raise AssertionError('%r did not raise Http404' % path)
+
+
+def test_resolve():
+    router = Router(create_view(TestView))
+    request = Request()
+    assert router(request, '') == 'index None'
+    assert router(request, '10/') == 'index 10'
+    assert router(request, 'by_author/10/') == 'by_author 10 30'
+    assert router(request, 'by_author/10/5') == 'by_author 10 5'
+    assert router(request, 'search/a/b/c/') == 'search a+b+c'
+    assert router(request, 'comments/3/') == 'comment 3'
+    assert router(request, 'comments/latest/') == 'latest'
+    assert router(request, 'admin/stats/') == 'stats'
+
+
+def test_not_found():
+    router = Router(create_view(TestView))
+    assert_404(router, '10/11/')
+    assert_404(router, 'by_author/')
+    assert_404(router, 'by_author/1/2/3/')
+    assert_404(router, 'comments/')
+    assert_404(router, 'comments/latest/1/')
+    # nested views that cannot be called themselves, and method handlers
+    assert_404(router, 'admin/')
+    assert_404(router, 'comments/get/1/')
+
+
+def test_routes_are_cached():
+    router = Router(create_view(TestView), cache_size=2)
+    router(Request(), 'by_author/10/')
+    router(Request(), 'by_author/10/')
+    assert router.cache.info()['hits'] == 1
+    assert_404(router, 'nope/nope/')
+    assert router.resolve('nope/nope/') is None
+    assert router.cache.info()['hits'] == 2
+
+
+def test_urls():
+    router = Router(create_view(TestView), prefix='books/')
+    pattern, = router.urls
+    match = pattern.resolve('books/by_author/10/')
+    assert match.func is router
+    assert match.func(Request(), **match.kwargs) == 'by_author 10 30'
+    assert pattern.resolve('authors/') is None
+
+
+def test_simple_view():
+    """The shared arguments of a ``SimpleView`` are taken from the path.
+    """
+    router = Router(create_view(BookView))
+    assert router(Request(), '10/') == 'book 10'
+    assert router(Request(), 'by_author/10/') == 'by_author 10 30'
+    assert router(Request(), 'by_author/10/5/') == 'by_author 10 5'
+    assert_404(router, 'by_author/')
+    assert_404(router, 'by_author/10/5/1/')
@@ -37,4 +37,134 @@ def test_mixed():
     assert testview('request', foo='bar', id=1) == ('request', 1, 'bar')
     # ...but only if the correct order is maintained: here 'id' would
     # have two values, 'bar' and 1.
-    assert_raises(TypeError, testview, 'request', 'bar', id=1)
\ No newline at end of file
+    assert_raises(TypeError, testview, 'request', 'bar', id=1)
+
+def test_kwargs_passed_positionally():
+    """Shared keywords may be filled by remaining positional args.
+    """
+    class TestView(simple.SimpleView):
+        args = ['id']
+        kwargs = {'limit': 30}
+        def __call__(self):
+            return [self.id, self.limit]
+    testview = create_view(TestView)
+    assert testview('request', 1) == [1, 30]
+    assert testview('request', 1, 50) == [1, 50]
+    assert testview('request', limit=50, id=1) == [1, 50]
+
+
+def test_missing_args():
+    class TestView(simple.SimpleView):
+        args = ['id']
+        def __call__(self):
+            return self.id
+    testview = create_view(TestView)
+    assert_raises(TypeError, testview, 'request')
+
+
+def test_binding_is_compiled_once():
+    """The argument binding is set up when the view is created.
+    """
+    class TestView(simple.SimpleView):
+        args = ['a', 'b', 'c']
+        def __call__(self):
+            return [self.a, self.b, self.c]
+    testview = create_view(TestView)
+    binding = testview._instance._binding
+    assert binding.positional == ('request', 'a', 'b', 'c')
+    assert testview('request', 1, 2, 3) == [1, 2, 3]
+    assert testview('request', 1, c=3, b=2) == [1, 2, 3]
+    assert testview._instance._binding is binding
+
+
+def test_context_cache():
+    """The base context is cached per set of shared parameters.
+    """
+    calls = []
+    class TestView(simple.SimpleView):
+        args = ['id']
+        kwargs = {'limit': 30}
+        context_cache_timeout = 60
+        def _init_context(self):
+            calls.append((self.id, self.limit))
+            return {'id': self.id}
+        def __call__(self):
+            return self._base_context
+        def other(self):
+            self._base_context['foo'] = 'bar'
+            return self._base_context
+    testview = create_view(TestView)
+    assert testview('request', 1) == {'id': 1}
+    assert testview.other('request', 1) == {'id': 1, 'foo': 'bar'}
+    assert testview('request', 1) == {'id': 1}
+    assert testview('request', 1, limit=10) == {'id': 1}
+    assert testview('request', 2) == {'id': 2}
+    assert calls == [(1, 30), (1, 10), (2, 30)]
+
+    TestView._invalidate_context(1)
+    testview('request', 1)
+    testview('request', 1, limit=10)
+    assert calls == [(1, 30), (1, 10), (2, 30), (1, 30)]
+
+
+def test_context_cache_key():
+    class TestView(simple.SimpleView):
+        args = ['a', 'b']
+    key = TestView._context_cache_key
+    assert key({'a': '1:2', 'b': '3'}) != key({'a': '1', 'b': '2:3'})
+    assert key({'a': 10, 'b': 'x'}) == key({'a': '10', 'b': 'x'})
+    long_key = key({'a': 'x y ' * 100, 'b': ''})
+    assert len(long_key) < 250 and ' ' not in long_key
+
+
+def test_context_cache_backend():
+    """Any object with a Django-like cache API can be used.
+    """
+    class Backend(dict):
+        def set(self, key, value, timeout):
+            self[key] = value
+    class TestView(simple.SimpleView):
+        context_cache_timeout = 60
+        context_cache = Backend()
+        def _init_context(self):
+            return {'a': 1}
+        def __call__(self):
+            return self._base_context
+    testview = create_view(TestView)
+    assert testview('request') == {'a': 1}
+    assert list(TestView.context_cache.values()) == [{'a': 1}]
+
+
+def test_streamed_template():
+    """Streamed templates produce the same output as normal rendering,
+    but in chunks.
+    """
+    from django.http import HttpRequest
+    from django.template import Template
+    base = Template('<head>{% block title %}base{% endblock %}</head>'
+                    '<body>{% block body %}{% endblock %}</body>')
+    page = Template('{% extends base %}'
+                    '{% block title %}{{ block.super }}, {{ title }}'
+                    '{% endblock %}{% block body %}{% for i in items %}'
+                    '{{ i }}{% endfor %}|{{ extra }}{% endblock %}')
+
+    class TestView(simple.SimpleView):
+        def _init_context(self):
+            return {'base': base, 'title': 'page'}
+        def __call__(self):
+            return page, {'items': [1, 2, 3], 'extra': 'x'}
+        def single(self):
+            return simple.streamed(page), {'items': [4], 'extra': 'y'}
+    class StreamingView(TestView):
+        stream_templates = True
+
+    testview = create_view(TestView)
+    response = testview.single(HttpRequest())
+    chunks = list(response)
+    assert len(chunks) > 1
+    assert b''.join(chunks) == \
+        b'<head>base, page</head><body>4|y</body>'
+
+    response = create_view(StreamingView)(HttpRequest())
+    assert b''.join(response) == \
+        b'<head>base, page</head><body>123|x</body>'
@@ -0,0 +1,77 @@
+"""Test streaming the iterators returned by view methods.
+"""
+
+from django.template import Context, Template
+
+from django_oopviews import View, create_view, streaming
+from django_oopviews.streaming import map_chunks, stream_template
+
+
+def content(response):
+    return ''.join([chunk.decode('utf-8') if isinstance(chunk, bytes)
+                    else chunk for chunk in response])
+
+
+class ExportView(View):
+    produced = 0
+
+    def __after__(self, response):
+        response['X-Export'] = 'yes'
+        return map_chunks(response, lambda chunk: chunk.upper())
+
+    def __call__(self, request, rows):
+        for i in range(rows):
+            ExportView.produced += 1
+            yield 'row %d\n' % i
+
+    def plain(self, request):
+        return iter(['a', 'b'])
+
+
+def test_generator_is_streamed():
+    testview = create_view(ExportView)
+    ExportView.produced = 0
+    response = testview(None, 1000)
+    assert response['X-Export'] == 'yes'
+    # nothing is produced before the response is sent
+    assert ExportView.produced == 0
+    chunks = iter(response)
+    assert content([next(chunks)]) == 'ROW 0\n'
+    assert ExportView.produced == 1
+    assert content(chunks).count('ROW') == 999
+
+
+def test_stream_iterators():
+    class TestView(ExportView):
+        stream_iterators = True
+    assert content(create_view(TestView).plain(None)) == 'AB'
+    try:
+        create_view(ExportView).plain(None)
+    except TypeError:
+        pass    # __after__ got the plain iterator
+    else:
+        assert False, 'plain iterators are only streamed when asked for'
+
+
+def test_stream_template_fallback():
+    """Without the template internals it follows, the template is
+    rendered in a single chunk.
+    """
+    base = Template('<{% block a %}{% endblock %}>')
+    page = Template('{% extends base %}{% block a %}{{ a }}{% endblock %}')
+    context = {'base': base, 'a': 1}
+    assert ''.join(stream_template(page, Context(context))) == '<1>'
+    can_stream, streaming._can_stream = streaming._can_stream, False
+    try:
+        assert list(stream_template(page, Context(context))) == ['<1>']
+    finally:
+        streaming._can_stream = can_stream
+
+
+def test_stream_template_chunks():
+    """Loops are rendered as a single chunk.
+    """
+    page = Template('<ul>{% for i in items %}<li>{{ i }}{% endfor %}</ul>'
+                    '{% block a %}<p>{{ a }}<p>{{ a }}{% endblock %}')
+    chunks = list(stream_template(page, Context({'items': [1, 2], 'a': 3})))
+    assert chunks == ['<ul>', '<li>1<li>2', '</ul>', '<p>', '3', '<p>', '3']
@@ -0,0 +1,82 @@
+"""Test running views concurrently from multiple threads.
+"""
+
+import threading
+import time
+
+from django_oopviews import View, create_view
+
+
+def test_request_scoped_state():
+    """With ``request_scoped``, state set during a call is private to
+    that call, while ``__init__`` still only runs once.
+    """
+    class TestView(View):
+        request_scoped = True
+        inits = 0
+        def __init__(self):
+            TestView.inits += 1
+            self.base = 10
+        def __before__(self, args, kwargs):
+            self.value = self.base + args[0]
+        def __after__(self, response):
+            return response, self.value
+        def __call__(self, n):
+            self.base = 0
+            return self.value
+    testview = create_view(TestView)
+    assert testview(1) == (11, 11)
+    assert testview(2) == (12, 12)
+    assert not hasattr(testview._instance, 'value')
+    assert TestView.inits == 1
+    assert testview._instance.base == 10
+
+
+def test_request_scoped_static_methods():
+    """Callables that are not bound to the instance still work.
+    """
+    class TestView(View):
+        request_scoped = True
+        @staticmethod
+        def foo(n):
+            return n * 2
+        @classmethod
+        def bar(cls, n):
+            return cls, n
+    testview = create_view(TestView)
+    assert testview.foo(21) == 42
+    assert testview.bar(1) == (TestView, 1)
+
+
+def test_request_scoped_stress():
+    """Hammer a single proxy from many threads; no request may ever see
+    state that was set by another one.
+    """
+    class TestView(View):
+        request_scoped = True
+        def __before__(self, args, kwargs):
+            self.token = args[0]
+        def __call__(self, token):
+            time.sleep(0)   # encourage a thread switch
+            return self.token
+        class sub(View):
+            request_scoped = True
+            def __before__(self, args, kwargs):
+                self.token = args[0]
+            def __call__(self, token):
+                time.sleep(0)
+                return self.token
+    testview = create_view(TestView)
+
+    errors = []
+    def worker(n):
+        for i in range(500):
+            token = (n, i)
+            if testview(token) != token or testview.sub(token) != token:
+                errors.append(token)
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
@@ -0,0 +1,63 @@
+"""Test the phase timing of views.
+"""
+
+from django_oopviews import View, create_view
+from django_oopviews.timing import TimingRegistry, Histogram
+
+
+def test_phases_are_recorded():
+    registry = TimingRegistry()
+    calls = []
+    registry.add_sink(lambda *args: calls.append(args))
+
+    class TestView(View):
+        timings = registry
+        def __before__(self, args, kwargs):
+            if args and args[0] == 'stop':
+                return 'stopped'
+        def __after__(self, response):
+            return response
+        def __call__(self, *args):
+            return 1
+        class sub(View):
+            timings = registry
+            def __call__(self):
+                return 2
+    testview = create_view(TestView)
+    assert testview() == 1
+    assert testview() == 1
+    assert testview('stop') == 'stopped'
+    assert testview.sub() == 2
+
+    name = '%s.%s' % (__name__, getattr(TestView, '__qualname__', 'TestView'))
+    stats = registry.stats(name)
+    assert stats[(name, '__call__', 'before')]['count'] == 3
+    assert stats[(name, '__call__', 'view')]['count'] == 2
+    assert stats[(name, '__call__', 'after')]['count'] == 2
+
+    assert [(method, sorted(phases)) for view, method, phases in calls] == [
+        ('__call__', ['after', 'before', 'view']),
+        ('__call__', ['after', 'before', 'view']),
+        ('__call__', ['before']),
+        ('__call__', ['view']),
+    ]
+    assert calls[-1][0] != name
+
+
+def test_disabled_by_default():
+    class TestView(View):
+        def __call__(self):
+            return 1
+    testview = create_view(TestView)
+    assert testview.__call__ == testview._instance.__call__
+
+
+def test_histogram():
+    histogram = Histogram()
+    for i in range(1, 101):
+        histogram.add(i / 1000.0)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    assert summary['min'] == 0.001 and summary['max'] == 0.1
+    assert 0.05 <= summary['p50'] <= 0.1
+    assert summary['p99'] == 0.1
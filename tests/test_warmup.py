@@ -0,0 +1,41 @@
+"""Test building proxies ahead of time with ``warmup``.
+"""
+
+from django_oopviews import View, create_view, ctn
+from django_oopviews.warmup import warmup
+
+
+def test_warmup_builds_everything():
+    class TestView(View):
+        def __call__(self, request):
+            return 1
+        def foo(self, request):
+            return 2
+        class sub(View):
+            def bar(self, request):
+                return 3
+    testview = create_view(TestView)
+    proxy_class = type(testview)
+    assert 'foo' not in proxy_class.__dict__
+
+    report = warmup()
+    assert 'foo' in proxy_class.__dict__
+    assert 'sub' in proxy_class.__dict__
+    assert 'bar' in type(testview.sub).__dict__
+    assert '%s.TestView' % __name__ in report['views']
+    assert '%s.sub' % __name__ in report['views']
+    assert report['methods'] >= 3
+    assert report['seconds'] >= 0
+
+    # nothing is left to do
+    assert warmup()['methods'] == 0
+    assert testview.sub.bar(None) == 3
+
+
+def test_negotiation_table_built_on_creation():
+    class TestView(ctn.AbstractCTNView):
+        ctn_accept_binding = {'*/*': 'html'}
+        def html(self, request):
+            return 'html'
+    create_view(TestView)
+    assert '_ctn_table' in TestView.__dict__